@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from math import inf
+
+from CSRGraph import CSRGraph
+from Homework8GraphAlgorithms import floyd_warshall, matrix_to_lists, check_negative_cycles
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def blocked_floyd_warshall(graph, block_size=256, memmap_path=None, max_workers=None, as_array=False):
+    # Three-phase blocked Floyd-Warshall. For every block kb of k values:
+    #   1. run plain Floyd-Warshall inside the diagonal tile (kb, kb)
+    #   2. update the tiles in block row kb and block column kb using the finished diagonal tile
+    #   3. update every remaining tile (i, j) from tiles (i, kb) and (kb, j), each independent of the others
+    # Only a few tiles are touched at a time, so the working set stays in cache, and with memmap_path
+    # the matrix itself lives on disk in a numpy.memmap so it doesn't have to fit in RAM.
+    # Returns the same inf-padded matrix as floyd_warshall, or the NumPy matrix/memmap with as_array=True,
+    # and raises the same ValueError on a negative-weight cycle.
+    if np is None:
+        if memmap_path is not None or as_array:
+            raise ImportError("blocked_floyd_warshall needs NumPy for memmap_path and as_array")
+
+        return floyd_warshall(graph, "python")
+
+    n = len(graph)
+
+    if memmap_path is not None:
+        dist = np.memmap(memmap_path, dtype=np.float64, mode="w+", shape=(n, n))
+    else:
+        dist = np.empty((n, n))
+
+    integral = _fill_weight_matrix(dist, graph, block_size)
+
+    # Tiles are [start, end) ranges of node ids
+    blocks = [(start, min(n, start + block_size)) for start in range(0, n, block_size)]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for k_start, k_end in blocks:
+            # Phase 1: the diagonal tile
+            diagonal = np.array(dist[k_start:k_end, k_start:k_end])
+            _relax_tile(diagonal, diagonal, diagonal)
+            dist[k_start:k_end, k_start:k_end] = diagonal
+
+            # Phase 2: the rest of block row kb and block column kb
+            for start, end in blocks:
+                if start == k_start:
+                    continue
+
+                row_tile = np.array(dist[k_start:k_end, start:end])
+                _relax_tile(row_tile, diagonal, row_tile)
+                dist[k_start:k_end, start:end] = row_tile
+
+                column_tile = np.array(dist[start:end, k_start:k_end])
+                _relax_tile(column_tile, column_tile, diagonal)
+                dist[start:end, k_start:k_end] = column_tile
+
+            # Phase 3: every other tile only reads block row/column kb, so they can all run at once.
+            # NumPy releases the GIL inside minimum/add, so threads give real parallelism here.
+            k_row = np.array(dist[k_start:k_end, :])
+            k_column = np.array(dist[:, k_start:k_end])
+
+            jobs = [executor.submit(_relax_block_row, dist, blocks, start, end, k_start, k_row, k_column[start:end])
+                    for start, end in blocks if start != k_start]
+
+            for job in jobs:
+                job.result()
+
+    if memmap_path is not None:
+        dist.flush()
+
+    check_negative_cycles(np.diagonal(dist).tolist())
+
+    if as_array:
+        return dist
+
+    return matrix_to_lists(dist, integral)
+
+
+def _relax_tile(tile, left, right):
+    # tile[i][j] = min(tile[i][j], left[i][k] + right[k][j]) for each k in turn.
+    # left or right may be tile itself (phases 1 and 2), so the k loop has to stay in order.
+    for k in range(left.shape[1]):
+        np.minimum(tile, left[:, k, None] + right[None, k, :], out=tile)
+
+
+def _relax_block_row(dist, blocks, i_start, i_end, k_start, k_row, i_k_tile):
+    for j_start, j_end in blocks:
+        if j_start == k_start:
+            continue
+
+        tile = np.array(dist[i_start:i_end, j_start:j_end])
+        _relax_tile(tile, i_k_tile, k_row[:, j_start:j_end])
+        dist[i_start:i_end, j_start:j_end] = tile
+
+
+def _fill_weight_matrix(dist, graph, block_size):
+    # inf everywhere, 0 on the diagonal, then the edge weights, a band of rows at a time
+    n = len(graph)
+    integral = True
+
+    for start in range(0, n, block_size):
+        end = min(n, start + block_size)
+        band = np.full((end - start, n), inf)
+        band[np.arange(end - start), np.arange(start, end)] = 0
+
+        if isinstance(graph, CSRGraph):
+            offsets, targets, weights = graph.to_numpy()
+            first, last = offsets[start], offsets[end]
+            rows = np.repeat(np.arange(end - start), np.diff(offsets[start:end + 1]))
+            band[rows, targets[first:last]] = weights[first:last]
+            integral = graph.weight_typecode() != "d"
+        else:
+            for i in range(start, end):
+                for j, val in graph[i].items():
+                    band[i - start, j] = val
+                    if not isinstance(val, int):
+                        integral = False
+
+        dist[start:end, :] = band
+
+    return integral
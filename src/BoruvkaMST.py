@@ -0,0 +1,216 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from CSRGraph import CSRGraph
+from DisjointSet import DisjointSet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The weight-sorted edge endpoints every worker process scans, set once by _init_worker
+_worker_edges = None
+
+
+def boruvka_algorithm(graph, max_workers=None):
+    # Boruvka's MST: every round, each component picks its cheapest edge leaving it, all of those edges
+    # join the forest at once, and the components they connect are contracted. At most log2(n) rounds.
+    # Ties are broken by edge index, which keeps the picked edges from ever forming a cycle.
+    # The per-round "cheapest edge per component" pass is vectorized with NumPy. Without NumPy it can be
+    # split across max_workers processes instead, which is the only thing max_workers does: the NumPy pass
+    # is already faster than shipping the components to other processes every round.
+    # Returns the same symmetric adjacency-dict as kruskals_algorithm (a minimum spanning forest if the
+    # graph is disconnected).
+    n = len(graph)
+
+    if np is not None:
+        return _boruvka_numpy(graph)
+
+    if max_workers is not None and max_workers > 1:
+        return _boruvka_parallel(graph, max_workers)
+
+    sources, targets, weights = _undirected_edges(graph)
+
+    # Sort once by weight, so within a round the first edge found for a component is its cheapest
+    order = sorted(range(len(weights)), key=weights.__getitem__)
+    sources = [sources[i] for i in order]
+    targets = [targets[i] for i in order]
+    weights = [weights[i] for i in order]
+
+    mst = [{} for i in range(n)]
+    trees = DisjointSet(n)
+
+    # Edge ids still crossing between components
+    alive = list(range(len(weights)))
+
+    while alive:
+        component = [trees.find(node) for node in range(n)]
+
+        # Drop edges that now sit inside a single component, then find each component's cheapest way out
+        alive = [edge for edge in alive if component[sources[edge]] != component[targets[edge]]]
+
+        if not alive:
+            break
+
+        cheapest = _cheapest_edges(component, sources, targets, alive)
+        _contract(mst, trees, cheapest.values(), sources, targets, weights)
+
+    return mst
+
+
+def _boruvka_numpy(graph):
+    n = len(graph)
+
+    # The same edges as _undirected_edges, as arrays, stably sorted by weight
+    if isinstance(graph, CSRGraph):
+        offsets, targets, weights = graph.to_numpy()
+        sources = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+    else:
+        sources, targets, weights = (np.asarray(column) for column in _all_edges(graph))
+
+    # int64 before any u * n + v key is built, CSR targets are int32 and would wrap past n = 46341
+    sources = sources.astype(np.int64)
+    targets = targets.astype(np.int64)
+
+    # Keep u < v, plus any u > v edge whose reverse isn't stored
+    keep = sources < targets
+    backward = np.flatnonzero(~keep)
+    keep[backward] = ~np.isin(targets[backward] * n + sources[backward], sources * n + targets)
+
+    order = np.argsort(weights[keep], kind="stable")
+    sources = sources[keep][order]
+    targets = targets[keep][order]
+    weights = weights[keep][order].tolist()
+
+    mst = [{} for i in range(n)]
+    trees = DisjointSet(n)
+
+    # A NumPy view over the union-find parents, to read every node's root in a few vectorized hops
+    parent = np.frombuffer(trees.parent, dtype=np.int64)
+
+    alive = np.arange(len(weights))
+    while len(alive):
+        component = parent.copy()
+        while True:
+            hop = component[component]
+            if np.array_equal(hop, component):
+                break
+            component = hop
+
+        # Drop edges that now sit inside a single component, then find each component's cheapest way out
+        alive = alive[component[sources[alive]] != component[targets[alive]]]
+
+        if not len(alive):
+            break
+
+        _contract(mst, trees, _cheapest_edges_numpy(component, sources, targets, alive, n), sources, targets, weights)
+
+    return mst
+
+
+def _boruvka_parallel(graph, max_workers):
+    # boruvka_algorithm with the cheapest-edge pass split across one process pool for the whole run.
+    # The sorted edge endpoints go to each worker once when it starts, so every round only sends the
+    # components and the range of edge ids each worker scans.
+    n = len(graph)
+    sources, targets, weights = _undirected_edges(graph)
+
+    order = sorted(range(len(weights)), key=weights.__getitem__)
+    sources = array("q", (sources[i] for i in order))
+    targets = array("q", (targets[i] for i in order))
+    weights = [weights[i] for i in order]
+
+    mst = [{} for i in range(n)]
+    trees = DisjointSet(n)
+
+    # Contiguous ranges of the sorted edge ids, a few per worker
+    chunk = max(1, -(-len(weights) // (4 * max_workers)))
+    ranges = [(first, min(len(weights), first + chunk)) for first in range(0, len(weights), chunk)]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(sources, targets)) as executor:
+        while True:
+            component = array("q", (trees.find(node) for node in range(n)))
+
+            # Merging is just keeping the answer from the earliest range for every component
+            cheapest = {}
+            for partial in executor.map(_cheapest_edges_in_range, [component] * len(ranges), ranges):
+                for key, edge in partial.items():
+                    cheapest.setdefault(key, edge)
+
+            if not cheapest:
+                break
+
+            _contract(mst, trees, cheapest.values(), sources, targets, weights)
+
+    return mst
+
+
+def _contract(mst, trees, edges, sources, targets, weights):
+    # Add every chosen edge, merging the components it joins
+    for edge in sorted(set(edges)):
+        u, v = int(sources[edge]), int(targets[edge])
+
+        if trees.union(u, v):
+            mst[u][v] = weights[edge]
+            mst[v][u] = weights[edge]
+
+
+def _undirected_edges(graph):
+    # Each undirected edge once, the same way kruskals_algorithm collects them
+    sources, targets, weights = [], [], []
+
+    for u, v, weight in zip(*_all_edges(graph)):
+        if u < v or u not in graph[v]:
+            sources.append(u)
+            targets.append(v)
+            weights.append(weight)
+
+    return sources, targets, weights
+
+
+def _all_edges(graph):
+    if isinstance(graph, CSRGraph):
+        edges = list(graph.edges())
+    else:
+        edges = [(u, v, weight) for u in range(len(graph)) for v, weight in graph[u].items()]
+
+    return [edge[0] for edge in edges], [edge[1] for edge in edges], [edge[2] for edge in edges]
+
+
+def _cheapest_edges(component, sources, targets, edges):
+    # Component -> the first (so cheapest) edge in sorted order that leaves it
+    cheapest = {}
+
+    for edge in edges:
+        a = component[sources[edge]]
+        b = component[targets[edge]]
+
+        if a != b:
+            if a not in cheapest:
+                cheapest[a] = edge
+            if b not in cheapest:
+                cheapest[b] = edge
+
+    return cheapest
+
+
+def _init_worker(sources, targets):
+    global _worker_edges
+    _worker_edges = (sources, targets)
+
+
+def _cheapest_edges_in_range(component, edge_range):
+    sources, targets = _worker_edges
+    return _cheapest_edges(component, sources, targets, range(*edge_range))
+
+
+def _cheapest_edges_numpy(component, sources, targets, edges, n):
+    # Both endpoints' components want the edge. Edge ids are in weight order, so the smallest id
+    # offered to a component is its cheapest way out.
+    cheapest = np.full(n, len(sources))
+    np.minimum.at(cheapest, component[sources[edges]], edges)
+    np.minimum.at(cheapest, component[targets[edges]], edges)
+
+    return cheapest[cheapest < len(sources)].tolist()
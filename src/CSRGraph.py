@@ -0,0 +1,272 @@
+from array import array
+from bisect import bisect_left
+from mmap import mmap, ACCESS_READ
+import struct
+import sys
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Binary file layout, everything little-endian:
+#   header: magic, format version, weight type (0 = int64, 1 = float64), padding, node count, edge count
+#   offsets: (nodes + 1) x int64
+#   targets: edges x int32, zero-padded to a multiple of 8 bytes
+#   weights: edges x int64 or float64
+FILE_MAGIC = b"CSRG"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sHBxQQ")
+
+
+class CSRGraph:
+    # Compressed sparse row graph: the neighbors of node u are targets[offsets[u]:offsets[u + 1]]
+    # and the matching edge weights are weights[offsets[u]:offsets[u + 1]].
+    # Indexing a CSRGraph gives a row that behaves like the dicts in an adjacency-dict,
+    # so the algorithms in Homework8GraphAlgorithms accept either form.
+    def __init__(self, offsets, targets, weights):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+        # The file the buffers are memory-mapped from, set by load()
+        self.path = None
+
+    @classmethod
+    def from_adjacency_dict(cls, graph):
+        n = len(graph)
+
+        offsets = array("q", [0] * (n + 1))
+        targets = array("i")
+        weights = []
+
+        for u in range(n):
+            # Keep each row sorted so lookups can binary search
+            row = sorted(graph[u].items())
+            targets.extend(v for v, w in row)
+            weights.extend(w for v, w in row)
+            offsets[u + 1] = len(targets)
+
+        return cls(offsets, targets, _weight_array(weights))
+
+    @classmethod
+    def from_edges(cls, num_nodes, sources, targets, weights):
+        # Counting sort of the edge list by source node
+        offsets = array("q", [0] * (num_nodes + 1))
+        for u in sources:
+            offsets[u + 1] += 1
+
+        for u in range(num_nodes):
+            offsets[u + 1] += offsets[u]
+
+        position = array("q", offsets[:num_nodes])
+        sorted_targets = array("i", [0] * len(targets))
+        sorted_weights = [0] * len(weights)
+
+        for u, v, w in zip(sources, targets, weights):
+            sorted_targets[position[u]] = v
+            sorted_weights[position[u]] = w
+            position[u] += 1
+
+        graph = cls(offsets, sorted_targets, _weight_array(sorted_weights))
+        graph.sort_rows()
+
+        return graph
+
+    @classmethod
+    def from_numpy(cls, offsets, targets, weights):
+        # Copy NumPy arrays into the same fixed-width array buffers the other constructors use
+        weights = np.asarray(weights)
+        weight_typecode = "d" if weights.dtype.kind == "f" else "q"
+
+        return cls(_array_from_numpy("q", offsets), _array_from_numpy("i", targets),
+                   _array_from_numpy(weight_typecode, weights))
+
+    def sort_rows(self):
+        # Sort the targets inside every row, carrying the weights along
+        for u in range(len(self)):
+            start, end = self.offsets[u], self.offsets[u + 1]
+            row = sorted(zip(self.targets[start:end], self.weights[start:end]))
+            for i, (v, w) in enumerate(row, start):
+                self.targets[i] = v
+                self.weights[i] = w
+
+    def to_adjacency_dict(self):
+        graph = []
+
+        for u in range(len(self)):
+            start, end = self.offsets[u], self.offsets[u + 1]
+            graph.append(dict(zip(self.targets[start:end], self.weights[start:end])))
+
+        return graph
+
+    def save(self, path):
+        n = len(self)
+        m = self.num_edges()
+        weight_typecode = self.weight_typecode()
+
+        with open(path, "wb") as file:
+            file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION, 1 if weight_typecode == "d" else 0, n, m))
+
+            file.write(_little_endian_bytes("q", self.offsets))
+            file.write(_little_endian_bytes("i", self.targets))
+
+            # The target section is padded so the weights start 8-byte aligned
+            if m % 2:
+                file.write(bytes(4))
+
+            file.write(_little_endian_bytes(weight_typecode, self.weights))
+
+    @classmethod
+    def load(cls, path, use_mmap=True):
+        # With use_mmap the arrays are memoryviews straight over the mapped file, so opening even a huge
+        # graph costs nothing up front and every process that loads it shares the same page cache
+        with open(path, "rb") as file:
+            header = file.read(FILE_HEADER.size)
+            magic, version, weight_type, n, m = FILE_HEADER.unpack(header)
+
+            if magic != FILE_MAGIC or version != FILE_VERSION:
+                raise ValueError("{} is not a version {} CSR graph file".format(path, FILE_VERSION))
+
+            weight_typecode = "d" if weight_type == 1 else "q"
+
+            # Byte ranges of the three sections
+            offsets_start = FILE_HEADER.size
+            targets_start = offsets_start + 8 * (n + 1)
+            weights_start = targets_start + 4 * (m + m % 2)
+            weights_end = weights_start + 8 * m
+
+            # memoryview.cast reads native byte order, so big-endian machines fall back to copying
+            if use_mmap and sys.byteorder == "little":
+                data = memoryview(mmap(file.fileno(), 0, access=ACCESS_READ))
+                graph = cls(data[offsets_start:targets_start].cast("q"),
+                            data[targets_start:targets_start + 4 * m].cast("i"),
+                            data[weights_start:weights_end].cast(weight_typecode))
+                graph.path = path
+
+                return graph
+
+            data = header + file.read()
+
+        return cls(_array_from_little_endian("q", data[offsets_start:targets_start]),
+                   _array_from_little_endian("i", data[targets_start:targets_start + 4 * m]),
+                   _array_from_little_endian(weight_typecode, data[weights_start:weights_end]))
+
+    def weight_typecode(self):
+        # "q" for int64 weights, "d" for float64, whether the buffers are arrays or memoryviews over a file
+        return getattr(self.weights, "typecode", None) or self.weights.format
+
+    def to_numpy(self):
+        if np is None:
+            raise ImportError("CSRGraph.to_numpy requires NumPy to be installed")
+
+        # Views over the same buffers, nothing is copied
+        return np.asarray(self.offsets), np.asarray(self.targets), np.asarray(self.weights)
+
+    def num_edges(self):
+        return len(self.targets)
+
+    def edges(self):
+        # Every stored (u, v, weight) triple, in row order
+        for u in range(len(self)):
+            start, end = self.offsets[u], self.offsets[u + 1]
+            for v, w in zip(self.targets[start:end], self.weights[start:end]):
+                yield u, v, w
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, node):
+        if not 0 <= node < len(self):
+            raise IndexError("node {} is not in the graph".format(node))
+
+        return CSRRow(self, self.offsets[node], self.offsets[node + 1])
+
+    def __iter__(self):
+        for u in range(len(self)):
+            yield self[u]
+
+
+class CSRRow:
+    # A read-only view of one node's neighbors, answering the same questions a neighbor dict does
+    __slots__ = ("graph", "start", "end")
+
+    def __init__(self, graph, start, end):
+        self.graph = graph
+        self.start = start
+        self.end = end
+
+    def keys(self):
+        return self.graph.targets[self.start:self.end]
+
+    def values(self):
+        return self.graph.weights[self.start:self.end]
+
+    def items(self):
+        return zip(self.keys(), self.values())
+
+    def get(self, node, default=None):
+        i = self._find(node)
+
+        if i is None:
+            return default
+
+        return self.graph.weights[i]
+
+    def _find(self, node):
+        i = bisect_left(self.graph.targets, node, self.start, self.end)
+
+        if i < self.end and self.graph.targets[i] == node:
+            return i
+
+        return None
+
+    def __getitem__(self, node):
+        i = self._find(node)
+
+        if i is None:
+            raise KeyError(node)
+
+        return self.graph.weights[i]
+
+    def __contains__(self, node):
+        return self._find(node) is not None
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return self.end - self.start
+
+
+def _weight_array(weights):
+    # Store integer weights as int64 and anything else as float64
+    if all(isinstance(w, int) for w in weights):
+        return array("q", weights)
+
+    return array("d", weights)
+
+
+def _array_from_numpy(typecode, values):
+    buffer = array(typecode)
+    buffer.frombytes(np.ascontiguousarray(values, dtype=buffer.typecode).tobytes())
+    return buffer
+
+
+def _little_endian_bytes(typecode, values):
+    values = array(typecode, values)
+
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values.tobytes()
+
+
+def _array_from_little_endian(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+
+    if sys.byteorder == "big":
+        values.byteswap()
+
+    return values
@@ -0,0 +1,46 @@
+from array import array
+
+
+class DisjointSet:
+    # Disjoint-set forest over the nodes 0..size-1, kept in flat int arrays.
+    # find() compresses paths and union() links by rank, so any sequence of operations
+    # runs in near-constant amortized time per call.
+    def __init__(self, size):
+        self.parent = array("q", range(size))
+        self.rank = array("B", bytes(size))
+
+    def find(self, node):
+        parent = self.parent
+
+        # Walk up to the root
+        root = node
+        while parent[root] != root:
+            root = parent[root]
+
+        # Point everything along the way straight at the root
+        while parent[node] != root:
+            parent[node], node = root, parent[node]
+
+        return root
+
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+
+        # Already in the same set
+        if a == b:
+            return False
+
+        # Hang the shorter tree under the taller one
+        if self.rank[a] < self.rank[b]:
+            a, b = b, a
+
+        self.parent[b] = a
+
+        if self.rank[a] == self.rank[b]:
+            self.rank[a] += 1
+
+        return True
+
+    def __len__(self):
+        return len(self.parent)
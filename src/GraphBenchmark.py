@@ -0,0 +1,148 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from random import seed
+from statistics import median_low
+from math import ceil
+from time import perf_counter_ns
+import argparse
+import csv
+import json
+
+from Homework8GraphAlgorithms import random_graph, kruskals_algorithm, prims_algorithm, dijkstras_algorithm, \
+    floyd_warshall, transitive_closure
+
+# Every algorithm in the grid, whether it runs on a digraph, and how to call it
+ALGORITHMS = {
+    "kruskal": (False, lambda graph: kruskals_algorithm(graph)),
+    "prim": (False, lambda graph: prims_algorithm(graph, 0)),
+    "dijkstra": (True, lambda graph: dijkstras_algorithm(graph, 0)),
+    "floyd_warshall": (True, lambda graph: _floyd_warshall_timing(graph)),
+    "transitive_closure": (True, lambda graph: transitive_closure(graph)),
+}
+
+# The same grid main() in Homework8GraphAlgorithms walks through
+DEFAULT_SIZES = [10, 20, 30, 40, 50]
+DEFAULT_DENSITIES = [(i + 1) / 10 for i in range(10)]
+
+CSV_FIELDS = ["algorithm", "size", "density", "edges", "samples", "min_ns", "median_ns", "p95_ns"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the graph algorithms over a (size, density, algorithm) grid")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--densities", type=float, nargs="+", default=DEFAULT_DENSITIES,
+                        help="fractions of the maximum density, in (0, 1]")
+    parser.add_argument("--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument("--repetitions", type=int, default=5, help="timed runs per graph")
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0], help="one random graph per seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--csv", help="write the summary to this CSV file")
+    parser.add_argument("--json", help="write the summary to this JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.densities, args.algorithms, args.repetitions, args.seeds, args.workers)
+
+    for row in results:
+        print("{algorithm:>18} n={size:<6} density={density:<5} min={min_ns}ns median={median_ns}ns p95={p95_ns}ns"
+              .format(**row))
+
+    if args.csv:
+        write_csv(results, args.csv)
+
+    if args.json:
+        write_json(results, args.json)
+
+    return 0
+
+
+def run_benchmarks(sizes, densities, algorithms, repetitions=5, seeds=(0,), max_workers=None):
+    # Every (size, density, algorithm, seed) cell is its own task so the pool can spread them out
+    tasks = [(size, density, algorithm, graph_seed, repetitions)
+             for size in sizes
+             for density in densities
+             for algorithm in algorithms
+             for graph_seed in seeds]
+
+    # Gather the samples of every seed for the same grid cell
+    samples = {}
+    edges = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(benchmark_task, *task) for task in tasks]
+
+        for future in as_completed(futures):
+            size, density, algorithm, num_edges, timings = future.result()
+            samples.setdefault((algorithm, size, density), []).extend(timings)
+            edges[(algorithm, size, density)] = num_edges
+
+    results = []
+    for algorithm in algorithms:
+        for size in sizes:
+            for density in densities:
+                key = (algorithm, size, density)
+                timings = sorted(samples[key])
+
+                results.append({
+                    "algorithm": algorithm,
+                    "size": size,
+                    "density": density,
+                    "edges": edges[key],
+                    "samples": len(timings),
+                    "min_ns": timings[0],
+                    "median_ns": median_low(timings),
+                    "p95_ns": percentile(timings, 95),
+                })
+
+    return results
+
+
+def benchmark_task(size, density, algorithm, graph_seed, repetitions):
+    directed, run_algorithm = ALGORITHMS[algorithm]
+
+    # Scale the density fraction the same way main() does
+    max_density = (size - 1) if directed else (size - 1) / 2
+    graph_density = density * max_density
+
+    # Seed per grid cell so every algorithm sees the same graph for a given seed
+    seed("{}-{}-{}-{}".format(graph_seed, size, density, directed))
+    graph = random_graph(size, graph_density, directed)
+
+    timings = []
+    for i in range(repetitions):
+        start = perf_counter_ns()
+        run_algorithm(graph)
+        timings.append(perf_counter_ns() - start)
+
+    num_edges = max(size - 1, int(graph_density * size))
+
+    return size, density, algorithm, num_edges, timings
+
+
+def _floyd_warshall_timing(graph):
+    # Some random digraphs have a negative-weight cycle. floyd_warshall only reports it after the full
+    # relaxation, so the run still times the same work.
+    try:
+        floyd_warshall(graph)
+    except ValueError:
+        pass
+
+
+def percentile(sorted_samples, percent):
+    # Nearest-rank percentile of an already sorted list
+    rank = max(1, ceil(len(sorted_samples) * percent / 100))
+    return sorted_samples[rank - 1]
+
+
+def write_csv(results, path):
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def write_json(results, path):
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
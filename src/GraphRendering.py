@@ -0,0 +1,46 @@
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha256
+from os import close, makedirs, remove, replace
+from os.path import exists, getsize, join, splitext
+from shutil import copyfile
+from subprocess import run, PIPE
+from tempfile import mkstemp
+
+
+def render_dot_files(dot_paths, cache_directory, max_workers=None, sfdp="sfdp"):
+    # Render every .dot file to a .png next to it, running up to max_workers sfdp processes at once.
+    # Returns a list of (dot path, png path) pairs, with None for the png if sfdp failed on that file.
+    makedirs(cache_directory, exist_ok=True)
+
+    # sfdp does the work in its own process, so threads are enough to keep several of them busy
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pngs = executor.map(lambda dot_path: render_dot_file(dot_path, cache_directory, sfdp), dot_paths)
+        return list(zip(dot_paths, pngs))
+
+
+def render_dot_file(dot_path, cache_directory, sfdp="sfdp"):
+    png_path = splitext(dot_path)[0] + ".png"
+
+    # Identical .dot content always renders to the same picture, so key the cache on its hash
+    with open(dot_path, "rb") as file:
+        digest = sha256(file.read()).hexdigest()
+
+    cached_png = join(cache_directory, digest + ".png")
+
+    if not exists(cached_png):
+        # Render into a temporary name first so a half-written file never looks cached. mkstemp picks a name
+        # no other thread or process sharing the cache can be using.
+        handle, temporary_png = mkstemp(suffix=".tmp", dir=cache_directory)
+        close(handle)
+
+        result = run([sfdp, "-Tpng", dot_path, "-Goverlap=scale", "-o", temporary_png], stdout=PIPE, stderr=PIPE)
+
+        if result.returncode != 0 or getsize(temporary_png) == 0:
+            remove(temporary_png)
+            return None
+
+        replace(temporary_png, cached_png)
+
+    copyfile(cached_png, png_path)
+
+    return png_path
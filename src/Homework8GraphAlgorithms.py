@@ -1,14 +1,28 @@
-from random import randrange, randint, seed
+from random import Random, randrange, randint, seed
 import sys
-from queue import PriorityQueue
-from math import inf, isfinite
+from heapq import heappush, heappop, heapify
+from math import inf, isfinite, isqrt, log2
 from os.path import exists
-from os import makedirs, chdir, listdir
-from subprocess import run, PIPE
+from os import makedirs
+from shutil import which
+import argparse
 from time import time
-
-
-def main():
+from collections import deque
+from contextlib import nullcontext
+from array import array
+from CSRGraph import CSRGraph
+from DisjointSet import DisjointSet
+from GraphRendering import render_dot_files
+from Instrumentation import StatsLog
+from ResultWriter import ResultWriter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def main(render=True, echo=True, stats_path=None, quiet=False):
     # Create the data structure for storing a graph
     # Use a list of dictionaries, where each dict is int->int
     # Where the first int is the node id and the second is the weight of the edge
@@ -28,188 +42,203 @@ def main():
     # Have a list hold all the graphs until we want to visualize them
     graphs = []
 
-    # sfdp -Tpng dotExample.dot -Gsplines=true -Goverlap=scale -o dotOutput.png
+    # Rendered with: sfdp -Tpng dotExample.dot -Goverlap=scale -o dotOutput.png
 
     # Keep a counter for filenames
     counter = 1
 
-    # Open up three files: one to hold output of Dijkstra's, one to hold output of Floyd-Warshall, and one for the TC
-    dijkstra_out = open(working_directory + "dijkstra_output.txt", "w")
-    floyd_warshall_out = open(working_directory + "floyd_warshall_output.txt", "w")
-    mst_prim_out = open(working_directory + "mst_prim_runtime_output.txt", "w")
-    mst_kruskal_out = open(working_directory + "mst_kruskal_output.txt", "w")
-
-    # Generate random graphs
-    for n in [10, 20, 30, 40, 50]:
-        # Create this directory
-        folder_directory = "{}/size_{}/".format(working_directory, n)
-        makedirs(folder_directory)
-
-        # Max edges: n(n-1) -> directed
-        #            (n(n-1))/2 -> undirected
-        max_edges_directed = n * (n - 1)
-        max_edges_undirected = max_edges_directed / 2
-
-        max_density_directed = max_edges_directed / n
-        max_density_undirected = max_edges_undirected / n
-
-        for i in range(10):
-            d = (i + 1) * max_density_undirected / 10
-            graph = random_graph(n, d)
-
-            print("Undirected Graph {} - n={} e={} d={}".format(counter, n, max(n - 1, int(d * n)), d))
-            dot_syntax = convert_to_dot_syntax(graph)
-            print(dot_syntax)
-            print()
-
-            filename = "undirected_graph_{}.dot".format(counter)
-
-            # Write the file
-            file = open(folder_directory + filename, "w")
-            file.write(dot_syntax)
-
-            # Add the entry to the list
-            graphs.append(filename)
-
-            print("Kruskal's Minimum Spanning Tree")
-            start = time()
-            mst = kruskals_algorithm(graph)
-            end = time()
-            delta = end - start
-            print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
-            mst_kruskal_out.write("MST of graph {} -> Elapsed time: {} microseconds ({} seconds)\n\n"
-                                  .format(counter, delta * 1000000, delta))
-            dot_syntax = convert_to_dot_syntax(mst)
-            print(dot_syntax)
-
-            filename = "mst_kruskal_{}.dot".format(counter)
-
-            # Write the file
-            file = open(folder_directory + filename, "w")
-            file.write(dot_syntax)
-
-            # Add the entry to the list
-            graphs.append(filename)
-
-            print()
-
-            print("Prim's Minimum Spanning Tree")
-            start = time()
-            mst = prims_algorithm(graph, 0)
-            end = time()
-            delta = end - start
-            print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
-            mst_prim_out.write("MST of graph {} -> Elapsed time: {} microseconds ({} seconds)\n\n"
-                               .format(counter, delta * 1000000, delta))
-            dot_syntax = convert_to_dot_syntax(mst, True)
-            print(dot_syntax)
-            filename = "mst_prim_{}.dot".format(counter)
-
-            # Write the file
-            file = open(folder_directory + filename, "w")
-            file.write(dot_syntax)
-
-            # Add the entry to the list
-            graphs.append(filename)
-            print()
-
-            d = (i + 1) * max_density_directed / 10
-
-            print("Generating digraph")
-            graph = random_graph(n, d, True)
-
-            # Add the filename of the graph
-            print("Directed graph {} - n={}, e={}, d={}".format(counter, n, max(n - 1, int(d * n)), d))
-
-            dot_syntax = convert_to_dot_syntax(graph, True)
-            print(dot_syntax)
-            print()
-
-            filename = "directed_graph_{}.dot".format(counter)
-
-            # Write the file
-            file = open(folder_directory + filename, "w")
-            file.write(dot_syntax)
-
-            # Add the entry to the list
-            graphs.append(filename)
-
-            print("Dijkstra's one-to-all shortest path starting at node 0")
-            start = time()
-            dijkstras_dist, dijkstras_pi = dijkstras_algorithm(graph, 0)
-            end = time()
-            delta = end - start
-            print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
-            print("d: {}".format(dijkstras_dist))
-            print("pi: {}\n".format(dijkstras_pi))
-
-            # Print to file
-            dijkstra_out.write("Digraph id: {}\n".format(counter))
-            dijkstra_out.write("Elapsed time: {} microseconds ({} seconds)\n"
-                               .format(delta * 1000000, delta))
-            dijkstra_out.write("d: {}\n".format(dijkstras_dist))
-            dijkstra_out.write("pi: {}\n\n".format(dijkstras_pi))
-
-            print("Floyd-Warshall all-pairs shortest path")
-            start = time()
-            floyd_warshalls = floyd_warshall(graph)
-            end = time()
-            delta = end - start
-            print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
-            output = print_adjacency_matrix(floyd_warshalls)
-            print(output)
-            print()
-
-            # Print to file
-            floyd_warshall_out.write("Digraph id: {}\n".format(counter))
-            floyd_warshall_out.write("Elapsed time: {} microseconds ({} seconds)\n"
-                                     .format(delta * 1000000, delta))
-            floyd_warshall_out.write(output + "\n")
-
-            print("Transitive closure")
-            start = time()
-            transitive_closure_graph = transitive_closure(graph)
-            end = time()
-            delta = end - start
-            print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
-            dot_syntax = convert_to_dot_syntax(transitive_closure_graph, True, False)
-            print(dot_syntax)
-
-            filename = "transitive_closure_{}.dot".format(counter)
-
-            # Write the file
-            file = open(folder_directory + filename, "w")
-            file.write(dot_syntax)
-
-            # Add the entry to the list
-            graphs.append(filename)
-
-            # Increment the counter
-            counter += 1
-
-    print("Generating graphs...")
-    chdir(working_directory)
-
-    for n in [10, 20, 30, 40, 50]:
-        folder_directory = "size_{}/".format(n)
-
-        print("Entering directory {}".format(folder_directory))
-
-        # Change to that directory
-        chdir(folder_directory)
-
-        for file in listdir("./"):
-            print("Generating graph based on {}".format(file))
-            run("sfdp -Tpng {} -Goverlap=scale -o {}.png".format(file, file[:-4]), stdout=PIPE, stderr=PIPE, shell=True)
-
-        print()
-        chdir("..")
+    # All console and file output goes through a background writer, so the loop below never waits on I/O.
+    # Quiet mode keeps only the headers and timings on the console. Operation counts for every run go to a
+    # JSON-lines log, only when asked for. Both are closed on the way out even if a run fails, so nothing
+    # already queued is lost.
+    with ResultWriter(quiet=quiet) as out, \
+            (StatsLog(stats_path) if stats_path is not None else nullcontext()) as stats_log:
+        # The four report files, opened by the writer on first use and closed with it
+        dijkstra_out = working_directory + "dijkstra_output.txt"
+        floyd_warshall_out = working_directory + "floyd_warshall_output.txt"
+        mst_prim_out = working_directory + "mst_prim_runtime_output.txt"
+        mst_kruskal_out = working_directory + "mst_kruskal_output.txt"
+
+        # Generate random graphs
+        for n in [10, 20, 30, 40, 50]:
+            # Create this directory
+            folder_directory = "{}/size_{}/".format(working_directory, n)
+            makedirs(folder_directory)
+
+            # Max edges: n(n-1) -> directed
+            #            (n(n-1))/2 -> undirected
+            max_edges_directed = n * (n - 1)
+            max_edges_undirected = max_edges_directed / 2
+
+            max_density_directed = max_edges_directed / n
+            max_density_undirected = max_edges_undirected / n
+
+            for i in range(10):
+                d = (i + 1) * max_density_undirected / 10
+                graph = random_graph(n, d)
+
+                out.print("Undirected Graph {} - n={} e={} d={}".format(counter, n, max(n - 1, int(d * n)), d),
+                          summary=True)
+                filename = "undirected_graph_{}.dot".format(counter)
+
+                # Streamed to disk on the writer thread, echoed to the console only if asked
+                out.write_file(folder_directory + filename, iter_dot_syntax(graph), echo=echo)
+
+                # Add the entry to the list
+                graphs.append(folder_directory + filename)
+
+                out.print("Kruskal's Minimum Spanning Tree", summary=True)
+                stats = {} if stats_log is not None else None
+                start = time()
+                mst = kruskals_algorithm(graph, stats=stats)
+                end = time()
+                delta = end - start
+                if stats_log is not None:
+                    stats_log.record("kruskal", graph, stats, graph_id=counter, seconds=delta)
+                out.print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta), summary=True)
+                out.append(mst_kruskal_out, "MST of graph {} -> Elapsed time: {} microseconds ({} seconds)\n\n"
+                           .format(counter, delta * 1000000, delta))
+                filename = "mst_kruskal_{}.dot".format(counter)
+
+                # Streamed to disk on the writer thread, echoed to the console only if asked
+                out.write_file(folder_directory + filename, iter_dot_syntax(mst), echo=echo)
+
+                # Add the entry to the list
+                graphs.append(folder_directory + filename)
+
+                out.print()
+
+                out.print("Prim's Minimum Spanning Tree", summary=True)
+                stats = {} if stats_log is not None else None
+                start = time()
+                mst = prims_algorithm(graph, 0, stats=stats)
+                end = time()
+                delta = end - start
+                if stats_log is not None:
+                    stats_log.record("prim", graph, stats, graph_id=counter, seconds=delta)
+                out.print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta), summary=True)
+                out.append(mst_prim_out, "MST of graph {} -> Elapsed time: {} microseconds ({} seconds)\n\n"
+                           .format(counter, delta * 1000000, delta))
+                filename = "mst_prim_{}.dot".format(counter)
+
+                # Streamed to disk on the writer thread, echoed to the console only if asked
+                out.write_file(folder_directory + filename, iter_dot_syntax(mst, True), echo=echo)
+
+                # Add the entry to the list
+                graphs.append(folder_directory + filename)
+                out.print()
+
+                d = (i + 1) * max_density_directed / 10
+
+                out.print("Generating digraph")
+                graph = random_graph(n, d, True)
+
+                # Add the filename of the graph
+                out.print("Directed graph {} - n={}, e={}, d={}".format(counter, n, max(n - 1, int(d * n)), d),
+                          summary=True)
+
+                filename = "directed_graph_{}.dot".format(counter)
+
+                # Streamed to disk on the writer thread, echoed to the console only if asked
+                out.write_file(folder_directory + filename, iter_dot_syntax(graph, True), echo=echo)
+
+                # Add the entry to the list
+                graphs.append(folder_directory + filename)
+
+                out.print("Dijkstra's one-to-all shortest path starting at node 0", summary=True)
+                stats = {} if stats_log is not None else None
+                start = time()
+                dijkstras_dist, dijkstras_pi = dijkstras_algorithm(graph, 0, stats=stats)
+                end = time()
+                delta = end - start
+                if stats_log is not None:
+                    stats_log.record("dijkstra", graph, stats, graph_id=counter, seconds=delta)
+                out.print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta), summary=True)
+                out.print("d: {}".format(dijkstras_dist))
+                out.print("pi: {}\n".format(dijkstras_pi))
+
+                # Print to file
+                out.append(dijkstra_out, "Digraph id: {}\n".format(counter))
+                out.append(dijkstra_out, "Elapsed time: {} microseconds ({} seconds)\n"
+                           .format(delta * 1000000, delta))
+                out.append(dijkstra_out, "d: {}\n".format(dijkstras_dist))
+                out.append(dijkstra_out, "pi: {}\n\n".format(dijkstras_pi))
+
+                out.print("Floyd-Warshall all-pairs shortest path", summary=True)
+                start = time()
+                try:
+                    output = print_adjacency_matrix(floyd_warshall(graph))
+                except ValueError as error:
+                    # Path weights are unbounded below, so there is no matrix to show
+                    output = str(error)
+                end = time()
+                delta = end - start
+                out.print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta), summary=True)
+                out.print(output)
+                out.print()
+
+                # Print to file
+                out.append(floyd_warshall_out, "Digraph id: {}\n".format(counter))
+                out.append(floyd_warshall_out, "Elapsed time: {} microseconds ({} seconds)\n"
+                           .format(delta * 1000000, delta))
+                out.append(floyd_warshall_out, output + "\n")
+
+                out.print("Transitive closure", summary=True)
+                start = time()
+                transitive_closure_graph = transitive_closure(graph)
+                end = time()
+                delta = end - start
+                out.print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta), summary=True)
+                filename = "transitive_closure_{}.dot".format(counter)
+
+                # Streamed to disk on the writer thread, echoed to the console only if asked
+                out.write_file(folder_directory + filename, iter_dot_syntax(transitive_closure_graph, True, False),
+                               echo=echo)
+
+                # Add the entry to the list
+                graphs.append(folder_directory + filename)
+
+                # Increment the counter
+                counter += 1
+
+        # The .dot files have to be on disk before sfdp can read them
+        out.flush()
+
+        if render and which("sfdp") is None:
+            out.print("sfdp was not found, skipping rendering", summary=True)
+        elif render:
+            out.print("Generating graphs...", summary=True)
+
+            # Render every .dot file in parallel, reusing pictures of identical .dot files from earlier runs
+            for dot_path, png_path in render_dot_files(graphs, "graph_output/png_cache"):
+                if png_path is None:
+                    out.print("Failed to render {}".format(dot_path), summary=True)
+
+            out.print()
+
+        out.print("All output can be found in {}".format(working_directory), summary=True)
 
-    print("All output can be found in {}".format(working_directory))
     return 0
 
 
-def floyd_warshall(graph):
+def floyd_warshall(graph, backend=None, next_hop=False):
+    # Pick the engine: NumPy when it's installed, otherwise fall back to the pure-Python triple loop.
+    # With next_hop=True also return a flat n*n int32 array where next_hop[u * n + v] is the node after u
+    # on a shortest u -> v path (-1 if there is none), for floyd_warshall_path to walk.
+    # Raises ValueError if the graph has a negative-weight cycle, whichever engine runs.
+    if backend is None:
+        backend = "numpy" if np is not None else "python"
+
+    if backend == "numpy":
+        if np is None:
+            raise ImportError("The numpy backend for floyd_warshall requires NumPy to be installed")
+        return _floyd_warshall_numpy(graph, next_hop)
+    elif backend != "python":
+        raise ValueError("Unknown floyd_warshall backend: {}".format(backend))
+
+    if next_hop:
+        return _floyd_warshall_next_hop(graph)
+
     # Create the weight matrix, with special condition of inf if there isn't an edge connecting two nodes
     adj_matrix = [[inf if i != j else 0 for j in range(len(graph))] for i in range(len(graph))]
 
@@ -222,90 +251,369 @@ def floyd_warshall(graph):
             for j in range(len(graph)):
                 adj_matrix[i][j] = min(adj_matrix[i][j], adj_matrix[i][k] + adj_matrix[k][j])
 
+    check_negative_cycles(adj_matrix[i][i] for i in range(len(graph)))
+
     return adj_matrix
 
 
-def kruskals_algorithm(graph):
+def _floyd_warshall_next_hop(graph):
+    n = len(graph)
+
+    adj_matrix = [[inf if i != j else 0 for j in range(n)] for i in range(n)]
+
+    # Every edge starts out as its own next hop, and every node is its own
+    next_hop = array("i", [-1]) * (n * n)
+    for i in range(n):
+        next_hop[i * n + i] = i
+        for j, val in graph[i].items():
+            adj_matrix[i][j] = val
+            next_hop[i * n + j] = j
+
+    for k in range(n):
+        row_k = adj_matrix[k]
+        for i in range(n):
+            row_i = adj_matrix[i]
+            to_k = row_i[k]
+
+            if to_k == inf:
+                continue
+
+            # Going through k means leaving i the same way the path to k does
+            for j in range(n):
+                if to_k + row_k[j] < row_i[j]:
+                    row_i[j] = to_k + row_k[j]
+                    next_hop[i * n + j] = next_hop[i * n + k]
+
+    check_negative_cycles(adj_matrix[i][i] for i in range(n))
+
+    return adj_matrix, next_hop
+
+
+def floyd_warshall_path(next_hop, u, v):
+    # Lazily yield the nodes on a shortest u -> v path, u and v included, nothing if v is unreachable
+    n = isqrt(len(next_hop))
+
+    if next_hop[u * n + v] == -1:
+        return
+
+    yield u
+
+    # A simple path visits at most n nodes, anything longer is going around a negative cycle
+    source = u
+    steps = 0
+    while u != v:
+        u = next_hop[u * n + v]
+        yield u
+
+        steps += 1
+        if steps >= n:
+            raise ValueError("Path from {} to {} runs through a negative-weight cycle".format(source, v))
+
+
+def _floyd_warshall_numpy(graph, next_hop=False):
+    n = len(graph)
+
+    # Dense float matrix so inf can mark missing edges
+    dist = np.full((n, n), inf)
+    np.fill_diagonal(dist, 0)
+
+    # Remember whether every weight is an int so the result can be handed back the same way as the python engine
+    if isinstance(graph, CSRGraph):
+        # Fill every edge in one shot straight from the CSR arrays
+        offsets, targets, weights = graph.to_numpy()
+        dist[np.repeat(np.arange(n), np.diff(offsets)), targets] = weights
+        integral = graph.weight_typecode() != "d"
+    else:
+        integral = True
+        for i in range(n):
+            for j, val in graph[i].items():
+                dist[i, j] = val
+                if not isinstance(val, int):
+                    integral = False
+
+    if next_hop:
+        dist, hops = _relax_numpy_next_hop(dist)
+        check_negative_cycles(np.diagonal(dist).tolist())
+        return matrix_to_lists(dist, integral), hops
+
+    # Each k step relaxes every (i, j) pair at once: dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j])
+    for k in range(n):
+        np.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+
+    check_negative_cycles(np.diagonal(dist).tolist())
+
+    return matrix_to_lists(dist, integral)
+
+
+def _relax_numpy_next_hop(dist):
+    n = len(dist)
+
+    # Every edge starts out as its own next hop, and every node is its own
+    hops = np.where(np.isfinite(dist), np.arange(n, dtype=np.int32)[None, :], -1).astype(np.int32)
+
+    for k in range(n):
+        via_k = dist[:, k, None] + dist[None, k, :]
+        better = via_k < dist
+
+        # Going through k means leaving i the same way the path to k does
+        np.copyto(dist, via_k, where=better)
+        np.copyto(hops, np.broadcast_to(hops[:, k, None], hops.shape), where=better)
+
+    return dist, array("i", hops.tobytes())
+
+
+def check_negative_cycles(diagonal):
+    # After relaxing, a node that can reach itself for less than 0 sits on a negative-weight cycle. Every engine
+    # reports it this way: past that point the distances depend on the order of the updates, not the graph.
+    if any(dist < 0 for dist in diagonal):
+        raise ValueError("Graph contains a negative-weight cycle")
+
+
+def matrix_to_lists(dist, integral):
+    # Convert a NumPy matrix back to the same inf-padded list of lists the python engine returns
+    if integral:
+        return [[int(val) if isfinite(val) else val for val in row] for row in dist.tolist()]
+
+    return dist.tolist()
+
+
+def kruskals_algorithm(graph, lazy_sort=False, stats=None):
+    # Pass a dict as stats to have it filled with operation counts, see Instrumentation.StatsLog
+    n = len(graph)
+
     # Create an empty adjacency-dict
-    mst = [{} for i in range(len(graph))]
+    mst = [{} for i in range(n)]
 
-    # Create a list of edges and their weights
+    # Create a list of edges and their weights, taking each undirected edge once
     edges = []
-    seen_edges = set()
-    for u in range(len(graph)):
-        for v in graph[u]:
-            if (u, v) not in seen_edges:
-                edges.append((graph[u][v], (u, v)))
-                seen_edges.add((u, v))
-                seen_edges.add((v, u))
+    for u in range(n):
+        for v, weight in graph[u].items():
+            if u < v or u not in graph[v]:
+                edges.append((weight, (u, v)))
+
+    num_edges = len(edges)
 
-    edges.sort(key=lambda edge: edge[0])
+    if lazy_sort:
+        # Only pull edges off a heap until the tree is done instead of sorting all of them
+        heapify(edges)
+        ordered_edges = (heappop(edges) for i in range(len(edges)))
+    else:
+        edges.sort(key=lambda edge: edge[0])
+        ordered_edges = edges
+
+    # Keep a disjoint-set forest to keep track of the trees
+    trees = DisjointSet(n)
 
-    # Keep a list of sets to keep track of the trees
-    trees = [{node} for node in range(len(graph))]
+    # A spanning tree needs n - 1 edges, stop looking once we have them
+    edges_needed = n - 1
 
     # Iterate over each edge
-    for edge in edges:
+    examined = 0
+    for edge in ordered_edges:
+        if edges_needed <= 0:
+            break
+
+        examined += 1
+
         weight = edge[0]
         u, v = edge[1]
 
-        if trees[u].isdisjoint(trees[v]):
+        # Union the two trees if the edge connects different ones
+        if trees.union(u, v):
             # Add the edge to the MST
             mst[u][v] = weight
             mst[v][u] = weight
+            edges_needed -= 1
 
-            # Union the two sets
-            trees[u].update(trees[v])
+    if stats is not None:
+        # Every examined edge is one union() call, which does two find()s
+        stats.update(candidate_edges=num_edges, edges_examined=examined, union_calls=examined,
+                     unions=max(0, n - 1 - edges_needed), finds=2 * examined)
 
-            # Update all other sets
-            for node in trees[u] - {u}:
-                trees[node] = trees[u]
+        # Whatever is left on the heap was never popped
+        if lazy_sort:
+            stats.update(heap_pops=num_edges - len(edges))
 
     return mst
 
 
-def prims_algorithm(graph, start_node):
+def prims_algorithm(graph, start_node, variant=None, stats=None):
+    # Two flavours: "heap" is O(m log m) and wins on sparse graphs, "dense" scans an array of keys
+    # for the next node in O(n^2) total and wins once m log n passes n^2. None picks by density.
+    # The dense scan only beats the heap in practice when NumPy can relax whole CSR rows at once;
+    # on an adjacency-dict every edge costs a Python-level step either way, so the heap is kept there.
+    # A disconnected graph gets a minimum spanning forest: when a tree can't grow any more,
+    # the lowest numbered node not in a tree yet starts the next one.
+    # Pass a dict as stats to have it filled with operation counts, see Instrumentation.StatsLog
+    n = len(graph)
+
+    if variant is None:
+        variant = "heap"
+
+        if np is not None and isinstance(graph, CSRGraph) and n > 1 and graph.num_edges() * log2(n) >= n * n:
+            variant = "dense"
+
+    if variant == "dense":
+        if stats is not None:
+            # One scan of the keys per node added, and every edge looked at once
+            stats.update(variant="dense", selections=n, edges_scanned=sum(len(graph[u]) for u in range(n)))
+
+        return _prims_dense(graph, start_node)
+    elif variant != "heap":
+        raise ValueError("Unknown prims_algorithm variant: {}".format(variant))
+
     # Create an empty adjacency-dict
-    mst = [{} for i in range(len(graph))]
+    mst = [{} for i in range(n)]
 
-    # Create a visited set
-    visited = set()
+    # Create a visited list
+    visited = [False] * n
 
-    # Create a new PriorityQueue (Heap)
-    frontier = PriorityQueue()
+    # Use a plain heapq list as the PriorityQueue, stale entries are skipped when popped (lazy deletion)
+    frontier = []
 
     # Maintain a parent dictionary
-    pi = {i: None for i in range(len(graph))}
+    pi = {i: None for i in range(n)}
 
     # Maintain a key dictionary
-    key = {i: inf for i in range(len(graph))}
+    key = {i: inf for i in range(n)}
 
     key[start_node] = 0
 
     # Put the start node inside
-    frontier.put((0, start_node))
+    heappush(frontier, (0, start_node))
+
+    # Count the number of nodes added so far, stop as soon as every node is in the tree
+    nodes_added = 0
+    next_root = 0
+    trees = 1
+    pops = 0
+    peak_frontier = 0
+    while nodes_added < n:
+        if not frontier:
+            # This tree is done but nodes are left over, so start a new tree of the forest
+            while visited[next_root]:
+                next_root += 1
+
+            key[next_root] = 0
+            heappush(frontier, (0, next_root))
+            trees += 1
+
+        # The heap only grows between pops, so its size right before a pop is a local peak
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
+
+        weight, node = heappop(frontier)
+        pops += 1
+
+        # Skip entries for nodes already in the tree or keys that have since decreased
+        if visited[node] or weight > key[node]:
+            continue
+
+        visited[node] = True
+        nodes_added += 1
+
+        # Add the edge to the graph
+        if pi[node] is not None:
+            mst[pi[node]][node] = key[node]
+
+        for neighbor, weight in graph[node].items():
+            if not visited[neighbor] and weight < key[neighbor]:
+                pi[neighbor] = node
+                key[neighbor] = weight
+                heappush(frontier, (weight, neighbor))
+
+    if stats is not None:
+        # Everything pushed was either popped or is still on the heap, and every push after a tree's
+        # root is a key that got relaxed
+        pushes = pops + len(frontier)
+        stats.update(variant="heap", heap_pushes=pushes, heap_pops=pops, stale_pops=pops - nodes_added,
+                     relaxations=pushes - min(trees, n), peak_frontier=peak_frontier,
+                     edges_scanned=sum(len(graph[u]) for u in range(n)))
+
+    return mst
+
+
+def _prims_dense(graph, start_node):
+    n = len(graph)
+
+    # Create an empty adjacency-dict
+    mst = [{} for i in range(n)]
+
+    if np is not None:
+        return _prims_dense_numpy(graph, start_node, mst)
+
+    in_tree = [False] * n
+    pi = [None] * n
+    key = [inf] * n
+    key[start_node] = 0
+
+    for i in range(n):
+        # Cheapest node not in the tree yet (lowest id on ties, same as the heap)
+        node = min((u for u in range(n) if not in_tree[u]), key=key.__getitem__)
+
+        # Nothing left is reachable, so the lowest id still outside starts a new tree
+        if key[node] == inf:
+            node = in_tree.index(False)
 
-    # Count the number of nodes added so far
-    nodes_added = 1
-    while len(visited) != len(graph):
-        node = frontier.get()[1]
-        visited.add(node)
+        in_tree[node] = True
 
         # Add the edge to the graph
         if pi[node] is not None:
             mst[pi[node]][node] = key[node]
-            nodes_added += 1
 
         for neighbor, weight in graph[node].items():
-            if neighbor not in visited and weight < key[neighbor]:
+            if not in_tree[neighbor] and weight < key[neighbor]:
                 pi[neighbor] = node
                 key[neighbor] = weight
-                frontier.put((weight, neighbor))
 
     return mst
 
 
-def random_graph(num_nodes, density, directed=False):
+def _prims_dense_numpy(graph, start_node, mst):
+    n = len(graph)
+
+    # Dense weight matrix, inf where there's no edge
+    weights = np.full((n, n), inf)
+    if isinstance(graph, CSRGraph):
+        offsets, targets, values = graph.to_numpy()
+        weights[np.repeat(np.arange(n), np.diff(offsets)), targets] = values
+    else:
+        for u in range(n):
+            weights[u, list(graph[u].keys())] = list(graph[u].values())
+
+    in_tree = np.zeros(n, dtype=bool)
+    pi = np.full(n, -1)
+    key = np.full(n, inf)
+    key[start_node] = 0
+
+    # Keys of nodes already in the tree are parked at inf so argmin never picks them again
+    open_key = key.copy()
+
+    for i in range(n):
+        node = int(np.argmin(open_key))
+
+        # Nothing left is reachable, so the lowest id still outside starts a new tree
+        if open_key[node] == inf:
+            node = int(np.argmin(in_tree))
+
+        in_tree[node] = True
+        open_key[node] = inf
+
+        # Add the edge to the graph, with the weight as stored in the graph
+        if pi[node] != -1:
+            parent = int(pi[node])
+            mst[parent][node] = graph[parent][node]
+
+        # Relax every edge out of node in one go
+        better = (weights[node] < key) & ~in_tree
+        key[better] = weights[node][better]
+        open_key[better] = key[better]
+        pi[better] = node
+
+    return mst
+
+
+def random_graph(num_nodes, density, directed=False, rng_seed=None, csr=False):
     # Generate an empty adjacency-dict
     # An adjacency-dict looks similar to and adjacency list, except has constant-time edge lookups
     # Example:
@@ -314,47 +622,151 @@ def random_graph(num_nodes, density, directed=False):
     # 3 -> {5: 6}
     # 4 -> {1: 1, 5: 8}
     # 5 -> {3: 6, 4: 8}
+    # Pass csr=True to get a CSRGraph instead, which is the only sensible form for millions of edges
+
+    # Without an explicit seed draw one from the global generator, so seed() still makes runs reproducible
+    if rng_seed is None:
+        rng_seed = randrange(2 ** 63)
+
+    # The graph is always connected by the path 0 -> 1 -> ... -> n-1, the rest of the edges are random.
+    # Number every other possible edge 0..available-1 (see _decode_edge_ranks) and sample those ranks
+    # without replacement, so no draw is ever wasted on a duplicate edge.
+    available = _available_extra_edges(num_nodes, directed)
+
+    # We're allowed to create density * num_nodes edges overall, n-1 of which are the path
+    num_extra = min(max(0, int(density * num_nodes) - (num_nodes - 1)), available)
+
+    if np is not None:
+        sources, targets, weights = _random_edges_numpy(num_nodes, num_extra, available, directed, rng_seed)
+    else:
+        sources, targets, weights = _random_edges_python(num_nodes, num_extra, available, directed, rng_seed)
+
+    if csr:
+        return _csr_from_edges(num_nodes, sources, targets, weights, directed)
+
+    if np is not None:
+        # Plain ints in the adjacency-dict, not NumPy scalars
+        sources, targets, weights = sources.tolist(), targets.tolist(), weights.tolist()
 
     # Create an empty graph
     graph = [{} for i in range(num_nodes)]
 
-    # Make it minimally connected
-    for i in range(num_nodes - 1):
-        # Generate a random weight for this edge
-        weight = randint(-10, 100)
-
-        # Connect the nodes forward
-        graph[i][i + 1] = weight
+    for u, v, weight in zip(sources, targets, weights):
+        graph[u][v] = weight
 
         if not directed:
-            # Connect the nodes backward
-            graph[i + 1][i] = weight
+            # Add the edge the other way
+            graph[v][u] = weight
+
+    return graph
 
-    # We're allowed to create density * num_nodes edges overall
-    num_edges = int(density * num_nodes)
 
-    # Since the graph has to be connected, we have to add n-1 edges off the bat
-    current_edges = num_nodes - 1
+def _available_extra_edges(num_nodes, directed):
+    if num_nodes < 2:
+        return 0
 
-    # Loop until we fill the requisite number of edges
-    while current_edges < num_edges:
-        # Choose two random nodes
-        start, end = randrange(num_nodes), randrange(num_nodes)
+    # Every ordered/unordered pair of distinct nodes, minus the n-1 path edges
+    if directed:
+        return (num_nodes - 1) ** 2
 
-        # If they're not the same node and there isn't already an edge between them
-        if start != end and end not in graph[start]:
-            # Add this edge with a random weight in [-25, 100]
-            weight = randint(1, 100)
-            graph[start][end] = weight
+    return (num_nodes - 1) * (num_nodes - 2) // 2
 
-            if not directed:
-                # Add the edge the other way
-                graph[end][start] = weight
 
-            # Increase edge count
-            current_edges += 1
+def _random_edges_python(num_nodes, num_extra, available, directed, rng_seed):
+    rng = Random(rng_seed)
+
+    # Path edges get a weight in [-10, 100]
+    sources = list(range(num_nodes - 1))
+    targets = list(range(1, num_nodes))
+    weights = [rng.randint(-10, 100) for i in range(num_nodes - 1)]
+
+    if num_extra * 2 <= available:
+        ranks = rng.sample(range(available), num_extra)
+    else:
+        # Above half the possible edges it's cheaper to sample the edges we leave out
+        skipped = set(rng.sample(range(available), available - num_extra))
+        ranks = [rank for rank in range(available) if rank not in skipped]
+
+    for rank in ranks:
+        u, v = _decode_edge_ranks(rank, num_nodes, directed)
+        sources.append(u)
+        targets.append(v)
+
+    # Every other edge gets a weight in [1, 100]
+    weights.extend(rng.randint(1, 100) for i in range(num_extra))
+
+    return sources, targets, weights
 
-    return graph
+
+def _random_edges_numpy(num_nodes, num_extra, available, directed, rng_seed):
+    rng = np.random.default_rng(rng_seed)
+
+    if num_extra * 2 <= available:
+        ranks = rng.choice(available, size=num_extra, replace=False)
+    else:
+        # Above half the possible edges it's cheaper to sample the edges we leave out
+        keep = np.ones(available, dtype=bool)
+        keep[rng.choice(available, size=available - num_extra, replace=False)] = False
+        ranks = np.flatnonzero(keep)
+
+    extra_sources, extra_targets = _decode_edge_ranks(ranks.astype(np.int64), num_nodes, directed)
+
+    sources = np.concatenate((np.arange(num_nodes - 1, dtype=np.int64), extra_sources))
+    targets = np.concatenate((np.arange(1, num_nodes, dtype=np.int64), extra_targets))
+
+    # Path edges get a weight in [-10, 100], every other edge one in [1, 100]
+    weights = np.concatenate((rng.integers(-10, 101, size=max(0, num_nodes - 1)),
+                              rng.integers(1, 101, size=num_extra)))
+
+    return sources, targets, weights
+
+
+def _decode_edge_ranks(rank, num_nodes, directed):
+    # Turn the rank of a non-path edge back into its (u, v) pair. Works on an int or a NumPy array of ints.
+    if directed:
+        # Ranks count the pairs u != v row by row, skipping u -> u+1.
+        # Row u has n-1 slots once the diagonal is dropped and the path edge always sits at slot u,
+        # so rank r lands on slot r + r // (n - 1) + 1 of the diagonal-free numbering.
+        slot = rank + rank // (num_nodes - 1) + 1
+        u = slot // (num_nodes - 1)
+        column = slot % (num_nodes - 1)
+        v = column + (column >= u)
+        return u, v
+
+    # Undirected non-path edges are the pairs u < v with v - u >= 2, which match the pairs a < b of 0..n-2
+    # through u = a, v = b + 1. Ranks count those pairs in colex order: rank = b * (b - 1) / 2 + a.
+    if np is not None and isinstance(rank, np.ndarray):
+        b = ((1 + np.sqrt(1 + 8 * rank.astype(np.float64))) // 2).astype(np.int64)
+
+        # Fix up any off-by-one from floating point rounding
+        b -= b * (b - 1) // 2 > rank
+        b += (b + 1) * b // 2 <= rank
+    else:
+        b = (1 + isqrt(1 + 8 * rank)) // 2
+
+    a = rank - b * (b - 1) // 2
+    return a, b + 1
+
+
+def _csr_from_edges(num_nodes, sources, targets, weights, directed):
+    if np is None:
+        if not directed:
+            sources, targets = sources + targets, targets + sources
+            weights = weights + weights
+
+        return CSRGraph.from_edges(num_nodes, sources, targets, weights)
+
+    if not directed:
+        # Store every undirected edge in both rows
+        sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        weights = np.concatenate((weights, weights))
+
+    # Sort by source, then target, so each row is sorted like CSRGraph expects
+    order = np.argsort(sources * num_nodes + targets)
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=offsets[1:])
+
+    return CSRGraph.from_numpy(offsets, targets[order], weights[order])
 
 
 def create_adjacency_matrix_from_adjacency_list(adj_list):
@@ -371,103 +783,298 @@ def create_adjacency_matrix_from_adjacency_list(adj_list):
 
 
 def convert_to_dot_syntax(graph, directed=False, weighted=True):
+    return "".join(iter_dot_syntax(graph, directed, weighted))
+
+
+def iter_dot_syntax(graph, directed=False, weighted=True, chunk_lines=1024):
+    # Yield the DOT text a chunk of lines at a time so a big graph never has to sit in memory as one string
     # The arrows are different depending on whether or not the graph is directed
-    text = "strict "
     if directed:
-        text += "digraph "
+        yield "strict digraph G\n{\n"
         arrow = "->"
     else:
-        text += "graph "
+        yield "strict graph G\n{\n"
         arrow = "--"
 
-    # Start the file off with the graph name and an opening curly brace
-    text += "G\n{\n"
-
     # Grab the number of nodes
     n = len(graph)
 
+    lines = []
+
     # Loop over the edges
     for u in range(n):
-        for v in graph[u]:
-            text += "  {} {} {}".format(u, arrow, v)
+        for v, weight in graph[u].items():
+            # An undirected edge is stored both ways, only write it from its lower end
+            if not directed and v < u and u in graph[v]:
+                continue
 
             if weighted:
-                text += " [label=\"{}\"];\n".format(graph[u][v])
+                lines.append("  {} {} {} [label=\"{}\"];\n".format(u, arrow, v, weight))
             else:
-                text += ";\n"
+                lines.append("  {} {} {};\n".format(u, arrow, v))
 
-    # Add in the closing curly brace
-    text += "}"
+        if len(lines) >= chunk_lines:
+            yield "".join(lines)
+            lines = []
 
-    return text
+    # Add in the closing curly brace
+    lines.append("}")
+    yield "".join(lines)
 
 
-def dijkstras_algorithm(graph, start_node):
+def dijkstras_algorithm(graph, start_node, arrays=False, stats=None):
+    # With arrays=True the result comes back as an array('d') of distances and an array('i') of
+    # predecessors (-1 for none) instead of two dicts keyed by every node, see dijkstra_path.
+    # Pass a dict as stats to have it filled with operation counts, see Instrumentation.StatsLog
     n = len(graph)
 
-    # Need two dicts: one to hold shortest distances and one to hold predecessors
-    d = {node: inf for node in range(n)}
-    d[start_node] = 0
-    pi = {node: None for node in range(n)}
+    # Need two lists: one to hold shortest distances and one to hold predecessors
+    d = [inf] * n
+    pi = [None] * n
 
     # Keep track of visited nodes
-    visited = set()
+    visited = [False] * n
+    settled = 0
 
     # Update d[source]
     d[start_node] = 0
 
-    # Load the PQueue
-    frontier = PriorityQueue()
-    frontier.put((0, start_node))
+    # Load the heap, stale entries are skipped when popped (lazy deletion)
+    frontier = [(0, start_node)]
+
+    pops = 0
+    peak_frontier = 0
+
+    # While there are still nodes left to visit and something left to pop
+    while frontier and settled < n:
+        # The heap only grows between pops, so its size right before a pop is a local peak
+        if len(frontier) > peak_frontier:
+            peak_frontier = len(frontier)
 
-    # While there are still nodes left to visit
-    while len(visited) < n:
         # Grab highest priority node
-        current_node = frontier.get()[1]
+        current_dist, current_node = heappop(frontier)
+        pops += 1
+
+        # Skip nodes that were already settled through a shorter entry
+        if visited[current_node] or current_dist > d[current_node]:
+            continue
 
         # Mark this node visited
-        visited.add(current_node)
+        visited[current_node] = True
+        settled += 1
 
         # Look at its neighbors
-        for neighbor in graph[current_node]:
-            new_dist = graph[current_node][neighbor] + d[current_node]
+        for neighbor, weight in graph[current_node].items():
+            new_dist = weight + current_dist
 
             # If going through this node is better than whatever else it was doing
-            if neighbor not in visited and new_dist < d[neighbor]:
+            if not visited[neighbor] and new_dist < d[neighbor]:
                 # Update dict values
                 d[neighbor] = new_dist
                 pi[neighbor] = current_node
 
                 # Add it to the frontier
-                frontier.put((new_dist, neighbor))
+                heappush(frontier, (new_dist, neighbor))
+
+    if stats is not None:
+        # Everything pushed was either popped or is still on the heap, and every push but the
+        # source's is a relaxation
+        pushes = pops + len(frontier)
+        stats.update(heap_pushes=pushes, heap_pops=pops, stale_pops=pops - settled, relaxations=pushes - 1,
+                     settled=settled, peak_frontier=peak_frontier,
+                     edges_scanned=sum(len(graph[u]) for u in range(n) if visited[u]))
+
+    if arrays:
+        return array("d", d), array("i", [-1 if parent is None else parent for parent in pi])
 
     # Return minimum distance from start to every other node
+    return dict(enumerate(d)), dict(enumerate(pi))
+
+
+def dijkstra_path(dist, pred, v):
+    # Iterate over the nodes on the shortest path from the source of a dijkstras_algorithm(..., arrays=True)
+    # run to v, source first. Nothing comes out if v is unreachable.
+    if dist[v] == inf:
+        return iter(())
+
+    # The predecessors only lead backwards, so walk them once and hand the walk back reversed
+    path = []
+    while v != -1:
+        path.append(v)
+        v = pred[v]
+
+    return reversed(path)
+
+
+def bellman_ford(graph, start_node):
+    # Queue-based Bellman-Ford (SPFA): only nodes whose distance just dropped get their edges relaxed again.
+    # Unlike dijkstras_algorithm this is correct with negative edge weights.
+    d, pi = shortest_path_potentials(graph, [start_node])
+
+    # Return minimum distance from start to every other node, in the same shape as dijkstras_algorithm
+    return {node: d[node] for node in range(len(graph))}, {node: pi[node] for node in range(len(graph))}
+
+
+def shortest_path_potentials(graph, sources):
+    # SPFA from every node in sources at once (each at distance 0). Returns the distance and predecessor
+    # lists, which double as Johnson's potentials when sources is every node.
+    n = len(graph)
+
+    d = [inf] * n
+    pi = [None] * n
+
+    # Number of edges on the current best path to each node. A simple path has at most n - 1,
+    # so reaching n means the path loops through a negative cycle.
+    edge_count = [0] * n
+
+    queue = deque(sources)
+    in_queue = [False] * n
+    for source in sources:
+        d[source] = 0
+        in_queue[source] = True
+
+    while queue:
+        node = queue.popleft()
+        in_queue[node] = False
+
+        for neighbor, weight in graph[node].items():
+            new_dist = d[node] + weight
+
+            if new_dist < d[neighbor]:
+                d[neighbor] = new_dist
+                pi[neighbor] = node
+                edge_count[neighbor] = edge_count[node] + 1
+
+                if edge_count[neighbor] >= n:
+                    raise ValueError("Graph contains a negative-weight cycle")
+
+                if not in_queue[neighbor]:
+                    in_queue[neighbor] = True
+                    queue.append(neighbor)
+
     return d, pi
 
 
-def transitive_closure(graph):
-    # Copy the graph, set edge weights to 1, then pass it to floyd-warshall
-    copy_graph = {}
+def johnsons_algorithm(graph):
+    n = len(graph)
 
-    for i in range(len(graph)):
-        neighbors = graph[i]
-        copy_graph[i] = {}
+    # Potentials from a virtual source with a 0-weight edge to every node, which is the same as
+    # starting Bellman-Ford with every node at distance 0
+    h = shortest_path_potentials(graph, range(n))[0]
 
-        for neighbor in neighbors:
-            copy_graph[i][neighbor] = 1
+    # Reweight so every edge is non-negative: w'(u, v) = w(u, v) + h(u) - h(v)
+    reweighted = [{v: weight + h[u] - h[v] for v, weight in graph[u].items()} for u in range(n)]
 
-    matrix = floyd_warshall(copy_graph)
+    # Then a heap Dijkstra from every source, undoing the reweighting on the way out
+    matrix = []
+    for u in range(n):
+        d = dijkstras_algorithm(reweighted, u)[0]
+        matrix.append([d[v] - h[u] + h[v] if d[v] != inf else inf for v in range(n)])
 
-    new_graph = [{} for i in range(len(graph))]
+    # Same inf-padded matrix floyd_warshall returns
+    return matrix
+
+
+def transitive_closure(graph):
+    # Each node's reachable set is stored as an int bitset, bit j set means j is reachable
+    return closure_from_bitsets(reachability_bitsets(graph))
+
+
+def closure_from_bitsets(reach):
+    # The list-of-dicts closure graph for the bitsets reachability_bitsets returns
+    new_graph = [{} for i in range(len(reach))]
 
-    for i in range(len(new_graph)):
-        for j in range(len(new_graph)):
-            if isfinite(matrix[i][j]):
-                new_graph[i][j] = True
+    for i in range(len(reach)):
+        # Read the set bits off the binary string, lowest node id first
+        bits = bin(reach[i])[:1:-1]
+        new_graph[i] = dict.fromkeys([j for j, bit in enumerate(bits) if bit == "1"], True)
 
     return new_graph
 
 
+def reachability_bitsets(graph):
+    # Tarjan's strongly connected components, done iteratively so big graphs don't hit the recursion limit.
+    # Tarjan finishes components in reverse topological order, so by the time a component is popped
+    # every component it can reach already has its bitset, and one OR per edge propagates them.
+    n = len(graph)
+
+    index = [-1] * n
+    low = [0] * n
+    on_stack = [False] * n
+    stack = []
+    component = [-1] * n
+
+    # Reachability bitset per component
+    component_reach = []
+
+    counter = 0
+    for root in range(n):
+        if index[root] != -1:
+            continue
+
+        # Each work item is a node and an iterator over its neighbors
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        while work:
+            node, neighbors = work[-1]
+
+            # Descend into the first unvisited neighbor, if there is one
+            descended = False
+            for neighbor in neighbors:
+                if index[neighbor] == -1:
+                    index[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    on_stack[neighbor] = True
+                    work.append((neighbor, iter(graph[neighbor])))
+                    descended = True
+                    break
+                elif on_stack[neighbor] and index[neighbor] < low[node]:
+                    low[node] = index[neighbor]
+
+            if descended:
+                continue
+
+            # Every neighbor is done, so pass the low-link up to the parent
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+
+            # If this node is the root of a component, pop the whole component off the stack
+            if low[node] == index[node]:
+                component_id = len(component_reach)
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component[member] = component_id
+                    members.append(member)
+                    if member == node:
+                        break
+
+                # Everything in the component reaches every member (and itself)
+                bits = 0
+                for member in members:
+                    bits |= 1 << member
+
+                # Plus whatever the already-finished components it points at can reach
+                for member in members:
+                    for neighbor in graph[member]:
+                        other = component[neighbor]
+                        if other != component_id:
+                            bits |= component_reach[other]
+
+                component_reach.append(bits)
+
+    return [component_reach[component[i]] for i in range(n)]
+
+
 def print_adjacency_matrix(matrix):
     text = ""
 
@@ -480,8 +1087,17 @@ def print_adjacency_matrix(matrix):
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the graph algorithms on random graphs")
+    parser.add_argument("--no-render", action="store_true", help="skip rendering the .dot files with sfdp")
+    parser.add_argument("--no-echo", action="store_true", help="don't print every graph's DOT text to the console")
+    parser.add_argument("--quiet", action="store_true",
+                        help="only print headers and timings, the full results still go to the report files")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="append heap/relaxation/union-find counts of every run to FILE as JSON lines")
+    args = parser.parse_args()
+
     main_start = time()
-    main()
+    main(render=not args.no_render, echo=not args.no_echo, stats_path=args.stats, quiet=args.quiet)
     main_end = time()
     main_delta = main_end - main_start
     print("Total Elapsed time: {} microseconds ({} seconds)".format(main_delta * 1000000, main_delta))
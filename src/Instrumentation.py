@@ -0,0 +1,54 @@
+from time import perf_counter_ns
+import json
+
+from CSRGraph import CSRGraph
+
+
+class StatsLog:
+    # Appends one JSON object per line for every algorithm run, so runs can be compared on operation
+    # counts (heap pushes/pops, stale pops, relaxations, union-find calls, peak frontier) and not just time.
+    # The counts come from the stats= dict that dijkstras_algorithm, prims_algorithm and kruskals_algorithm
+    # fill in; without one those functions only keep a couple of local counters.
+    def __init__(self, path):
+        self.file = open(path, "a")
+
+    def record(self, algorithm, graph, stats, **fields):
+        record = {"algorithm": algorithm, "nodes": len(graph), "edges": count_edges(graph)}
+        record.update(fields)
+        record.update(stats)
+
+        self.file.write(json.dumps(record) + "\n")
+
+    def run(self, algorithm, function, graph, *args, **fields):
+        # Call function(graph, *args, stats=...), time it, log the record and hand back the result
+        stats = {}
+
+        start = perf_counter_ns()
+        result = function(graph, *args, stats=stats)
+        elapsed = perf_counter_ns() - start
+
+        self.record(algorithm, graph, stats, elapsed_ns=elapsed, **fields)
+        return result
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def count_edges(graph):
+    # Stored (directed) edges, so an undirected adjacency-dict counts each edge twice
+    if isinstance(graph, CSRGraph):
+        return graph.num_edges()
+
+    return sum(len(row) for row in graph)
+
+
+def read_stats(path):
+    # Every record in a StatsLog file, in the order they were written
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
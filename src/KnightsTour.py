@@ -1,15 +1,24 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import Event
+from random import Random
+
 from KnightsTourState import KnightsTourState
-from queue import PriorityQueue
+from KnightsTourSolver import warnsdorff_tour, get_tour_board_string, tie_ranks, central_squares
+from StructuredKnightsTour import StructuredTour
+from TranspositionTable import TranspositionTable
 import time
 
+# One cancellation Event per board of a portfolio run, set once by _init_worker
+_worker_cancel = None
+
 
 def main():
     output_file = open("knights_tour_results.txt", "w")
     total_start = time.time()
-    for i in [8, 12, 16, 20]:
+    for i in [8, 12, 16, 20, 100]:
         print("Running closed knight's tour on {}x{}".format(i, i))
         start = time.time()
-        stack = knights_tour(i, (i // 2, i // 2))
+        tour = warnsdorff_tour(i, (i // 2, i // 2))
         end = time.time()
         delta = end - start
 
@@ -17,79 +26,253 @@ def main():
         output_file.write("Closed knight's tour on {}x{}\n".format(i, i))
         output_file.write("Elapsed time: {} microseconds ({} seconds)\n".format(delta * 1000000, delta))
 
-        if stack is not None:
-            # Write to output file
-
+        if tour is not None:
+            # Write to output file, every square numbered by the move that lands on it
             output_file.write("Solution:\n")
-            while len(stack) != 0:
-                state = stack.pop()
-
-                output_file.write(get_current_board_string(state, i) + "\n")
+            output_file.write(get_tour_board_string(tour, i) + "\n")
         else:
             output_file.write("Impossible\n")
 
         print()
 
+    # The same boards again, all at once, each raced across a portfolio of diversified searches
+    print("Running portfolio search on {}".format(", ".join("{}x{}".format(i, i) for i in [8, 12, 16, 20])))
+    start = time.time()
+    results = portfolio_tours([8, 12, 16, 20])
+    end = time.time()
+    delta = end - start
+
+    print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
+    output_file.write("Portfolio search on 8x8, 12x12, 16x16 and 20x20\n")
+    output_file.write("Elapsed time: {} microseconds ({} seconds)\n".format(delta * 1000000, delta))
+    for i, (tour, strategy) in results.items():
+        if tour is not None:
+            output_file.write("{}x{}: first found by root {}, seed {}\n".format(i, i, *strategy))
+        else:
+            output_file.write("{}x{}: impossible\n".format(i, i))
+    output_file.write("\n")
+
+    print()
+
+    # Far bigger boards by divide and conquer. The tour is built lazily, so only its construction is timed here.
+    for i in [1000, 10000]:
+        print("Building structured closed knight's tour on {}x{}".format(i, i))
+        start = time.time()
+        tour = StructuredTour(i)
+        end = time.time()
+        delta = end - start
+
+        print("Elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
+        output_file.write("Structured closed knight's tour on {}x{}\n".format(i, i))
+        output_file.write("Elapsed time: {} microseconds ({} seconds)\n".format(delta * 1000000, delta))
+        output_file.write("Moves around the centre square: {}\n\n".format(tour.neighbors((i // 2, i // 2))))
+
+        print()
+
     total_end = time.time()
 
     delta = total_end - total_start
 
     print("Total elapsed time: {} microseconds ({} seconds)".format(delta * 1000000, delta))
     output_file.write("Total elapsed time: {} microseconds ({} seconds)\n".format(delta * 1000000, delta))
+    output_file.close()
+
+
+def knights_tour(n, starting_square, table_size=1 << 20, root=None, seed=None, cancel=None):
+    # Depth-first search for a closed tour on a single KnightsTourState, moving the knight forward with make()
+    # and taking moves back with unmake(). Squares are tried in Warnsdorff order (fewest onward moves first).
+    # A closed tour passes through every square, so the search runs from root (by default the middle of the board,
+    # where that order closes up best), and the tour is rotated to begin at starting_square at the end.
+    # Ties go to the square farthest from the centre, or with a seed to a random but fixed order of the squares.
+    # Every state the search backs out of is a proven dead end, and it goes into a TranspositionTable of at most
+    # table_size entries, so reaching the same visited squares and knight square by another path is cut at once.
+    # cancel is an Event polled every 1024 moves; once it's set the search gives up.
+    # Returns the tour as a list of (row, column) squares, or None if there isn't one (or the search was cancelled).
+    if n * n == 1:
+        return [starting_square]
+
+    # A closed tour alternates colours, so it needs an even number of squares
+    if n % 2 == 1:
+        return None
+
+    state = KnightsTourState(n, root if root is not None else (n // 2, n // 2))
+    dead_ends = TranspositionTable(table_size)
+
+    if seed is None:
+        tie_rank = tie_ranks(n)
+    else:
+        tie_rank = list(range(n * n))
+        Random(seed).shuffle(tie_rank)
+
+    # The squares still to try at every depth, best last so pop() takes it
+    stack = [_ordered_moves(state, tie_rank)]
+    moves_made = 0
+
+    while stack:
+        candidates = stack[-1]
+
+        # Nothing left to try here, so nothing below this state works: remember that and back up a move
+        if not candidates:
+            stack.pop()
+            if stack:
+                dead_ends.add(state.hash, n * n - len(state.path))
+                state.unmake()
+            continue
+
+        state.make(candidates.pop())
+
+        moves_made += 1
+        if cancel is not None and moves_made & 1023 == 0 and cancel.is_set():
+            return None
+
+        if state.is_complete():
+            # Check if we've visited every square and we can get back to where we started
+            if state.is_closed():
+                tour = state.tour()
+                i = tour.index(tuple(starting_square))
+                return tour[i:] + tour[:i]
+
+            state.unmake()
+            continue
+
+        # Already proven hopeless along some other path
+        if state.hash in dead_ends:
+            state.unmake()
+            continue
+
+        stack.append(_ordered_moves(state, tie_rank))
 
+    # Exhausted all states and haven't found a solution. Impossible
+    return None
 
-def knights_tour(n, starting_square):
-    movement_tuples = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
 
-    # Create a start state
-    start_state = KnightsTourState(starting_square, None, n)
+def _ordered_moves(state, tie_rank):
+    # The moves worth trying from here, best last so pop() takes it. That's none at all when the state is
+    # provably stuck, and just one when a square next to the knight has to be taken right now.
+    # Otherwise Warnsdorff order with the start counted as unvisited, so its neighbours look open and get saved
+    # for the end of the tour. Ties go to the lowest tie_rank, then to the first move in KNIGHT_MOVES, the same
+    # choice warnsdorff_tour makes.
+    n = state.n
+    start = state.start
+    unvisited = ~state.visited
+    squares_left = n * n - len(state.path)
 
-    # Implement a best-first search
-    frontier = PriorityQueue()
-    frontier.put(start_state)
+    # The tour has to come back to the start through one of its neighbours
+    if not state.move_masks[start] & unvisited:
+        return []
 
-    # Set of visited states
-    visited = set()
+    moves = state.unvisited_moves(state.path[-1])
 
-    count = 0
-    while not frontier.empty():
-        print("States in frontier: {}".format(len(frontier.queue)))
-        # Treat this list as a queue
-        current_state = frontier.get()
+    forced = []
+    for square in moves:
+        onward = state.move_masks[square] & unvisited
+        next_to_start = state.move_masks[square] >> start & 1
 
-        count += 1
-        print("Iteration {}".format(count))
-        print("Neighbors: {}".format(len(current_state.neighbors)))
-        print("Spaces visited: {}/{}".format(len(current_state.visited_locations), n**2))
-        print("Current State:")
-        print(get_current_board_string(current_state, n))
+        if not onward:
+            # Isolated: it can only be entered from here, and then nothing is left but the way home
+            if squares_left > 1 or not next_to_start:
+                return []
+            forced.append(square)
+        elif onward & (onward - 1) == 0 and not next_to_start:
+            # One way in besides this one and no way home, so the knight has to come in from here, now
+            forced.append(square)
 
-        # This state is now visited
-        visited.add(current_state)
+    if len(forced) > 1:
+        return []
+    elif forced:
+        return forced
 
-        # Check if we've visited every square and we ended up back where we started
-        if len(current_state.visited_locations) == n ** 2 and \
-                        current_state.knight_location == current_state.starting_location:
-            print("Terminal state!")
-            print("Took {} iterations".format(count))
-            ptr = current_state
-            stack = []
+    open_squares = unvisited | (1 << start)
+    # A stable sort keeps exact ties in move order, and reversing it puts the best last
+    moves.sort(key=lambda square: ((state.move_masks[square] & open_squares).bit_count(), tie_rank[square]))
+    moves.reverse()
 
-            while ptr is not None:
-                stack.append(ptr)
-                ptr = ptr.parent_state
+    return moves
 
-            return stack
 
-        # Generate every move the knight can make from its current position
-        for square in current_state.neighbors:
-            neighbor = KnightsTourState(square, current_state, n)
+def portfolio_tour(n, starting_square=(0, 0), strategies=8, max_workers=None):
+    # knights_tour raced across a process pool: the first of the diversified searches to find a tour wins
+    # and the others are cancelled. Returns (tour, strategy), strategy being the (root, seed) that found it,
+    # or (None, None) if there is no tour.
+    return portfolio_tours([n], {n: starting_square}, strategies, max_workers)[n]
 
-            if neighbor not in visited:
-                frontier.put(neighbor)
 
-    # Exhausted all states and haven't found a solution. Impossible
-    return None
+def portfolio_tours(sizes, starting_squares=None, strategies=8, max_workers=None):
+    # Closed tours for several board sizes at once. Every board gets strategies diversified searches (see
+    # portfolio_strategies) and they all share one process pool, so wall-clock time is set by the fastest search
+    # on each board rather than the unluckiest. The first tour found on a board sets that board's Event, which the
+    # rest of its searches poll, and its searches that haven't started yet are dropped.
+    # starting_squares maps a size to the square its tour should begin on, (0, 0) by default.
+    # Returns {size: (tour, strategy)} like portfolio_tour.
+    if starting_squares is None:
+        starting_squares = {}
+
+    results = {}
+    tasks = []
+    for n in sizes:
+        # Nothing to race: one square, or no closed tour at all
+        if n * n == 1 or n % 2 == 1 or n < 6:
+            results[n] = (knights_tour(n, starting_squares.get(n, (0, 0))), None)
+            continue
+
+        results[n] = (None, None)
+        tasks.extend((n, root, seed) for root, seed in portfolio_strategies(n, strategies))
+
+    if not tasks:
+        return results
+
+    cancel = {n: Event() for n, root, seed in tasks}
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(cancel,)) as executor:
+        pending = {executor.submit(_portfolio_search, n, root, seed): (n, root, seed) for n, root, seed in tasks}
+
+        while pending:
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                n, root, seed = pending.pop(future)
+                path = future.result()
+
+                if path is None or cancel[n].is_set():
+                    continue
+
+                cancel[n].set()
+                for other in not_done:
+                    if pending[other][0] == n:
+                        other.cancel()
+
+                # Closed, so it can start anywhere: rotate it to the requested square
+                i = path.index(tuple(starting_squares.get(n, (0, 0))))
+                results[n] = (path[i:] + path[:i], (root, seed))
+
+            pending = {future: task for future, task in pending.items() if not future.cancelled()}
+
+    return results
+
+
+def portfolio_strategies(n, count):
+    # (root, seed) pairs for count searches that differ as much as possible: the plain search from the centre first,
+    # then every other square near the centre as the root, each with its own random tie-break order
+    roots = [divmod(square, n) for square in central_squares(n)]
+    strategies = [(roots[0], None)]
+
+    for i in range(1, count):
+        strategies.append((roots[i % len(roots)], i))
+
+    return strategies
+
+
+def _init_worker(cancel):
+    global _worker_cancel
+    _worker_cancel = cancel
+
+
+def _portfolio_search(n, root, seed):
+    # The tour in the order it was found from root, or None if it was cancelled or there isn't one
+    if _worker_cancel[n].is_set():
+        return None
+
+    return knights_tour(n, root, root=root, seed=seed, cancel=_worker_cancel[n])
 
 
 def get_current_board_string(state, n):
@@ -0,0 +1,269 @@
+from array import array
+
+# The eight knight moves as (row, column) offsets, in the order every move table lists them
+KNIGHT_MOVES = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+
+
+def warnsdorff_tour(n, starting_square=(0, 0), closed=True, max_backtracks=1000000, attempts=16):
+    # Knight's tour on an n x n board by Warnsdorff's rule: always jump to the unvisited square with the fewest
+    # unvisited squares onward. Squares are numbered row * n + column and the moves and onward degrees live in
+    # flat arrays, so every step is a handful of array lookups and the whole tour is O(n^2).
+    #
+    # Ties go to the square farthest from the centre (the Squirrel-style rule: finish the edges before they
+    # turn into dead ends), then to the first move in KNIGHT_MOVES, so the tour is deterministic.
+    # For a closed tour the root of the path never counts as visited in the degrees. Its neighbours then always
+    # look like they still have a way out and get left for last, which brings the end of the path back around.
+    # That works best from the middle of the board (from an edge the edge-first tie-break uses up the root's
+    # neighbours early), and a cycle can start anywhere, so closed tours are grown from the squares nearest
+    # the centre, up to attempts of them, and the first one that closes is rotated to begin at starting_square.
+    # If the finished path doesn't end a knight move from its root, a few Posa rotations (reversing the tail
+    # of the path behind a square next to the end) look for an end that does.
+    #
+    # Only when all of that fails does it backtrack from starting_square, trying the next best square at the
+    # deepest step with one left, at most max_backtracks times (None for no limit, which can take minutes
+    # on a board with no tour). Returns the squares in order as (row, column) tuples, or None if there is
+    # no tour (or max_backtracks ran out).
+    size = n * n
+    start = starting_square[0] * n + starting_square[1]
+
+    if size == 1:
+        return [starting_square]
+
+    # A closed tour alternates colours, so it needs an even number of squares, and none exist below 6 x 6
+    if closed and (n % 2 == 1 or n < 6):
+        return None
+
+    # On an odd board an open tour has one more square of the corners' colour than of the other, so it has
+    # to start (and end) on that colour
+    if not closed and n % 2 == 1 and sum(starting_square) % 2 == 1:
+        return None
+
+    moves = knight_move_table(n)
+    degree = knight_degrees(moves, n)
+    tie_rank = tie_ranks(n)
+
+    if closed:
+        for root in central_squares(n)[:attempts]:
+            path = _warnsdorff_path(root, moves, bytearray(degree), tie_rank, n, closed, 0)
+
+            if path is not None:
+                i = path.index(start)
+                return [divmod(square, n) for square in path[i:] + path[:i]]
+
+    path = _warnsdorff_path(start, moves, degree, tie_rank, n, closed, max_backtracks)
+
+    if path is None:
+        return None
+
+    return [divmod(square, n) for square in path]
+
+
+def _warnsdorff_path(start, moves, degree, tie_rank, n, closed, max_backtracks):
+    size = n * n
+
+    visited = bytearray(size)
+    path = array("i", [start])
+
+    # Which ranked candidate each step of the path took, so backtracking knows what to try next
+    choice = bytearray(size)
+
+    visited[start] = 1
+    if not closed:
+        _leave(moves, degree, start)
+
+    backtracks = 0
+    while True:
+        if len(path) == size:
+            if not closed or _knight_move(path[-1], start, n) or _close_by_rotation(path, moves, start, n):
+                return path
+        else:
+            # The common case: take the best square and keep going
+            square = _best_candidate(path[-1], moves, degree, visited, tie_rank)
+
+            if square != -1:
+                choice[len(path)] = 0
+                _visit(path, square, moves, degree, visited)
+                continue
+
+        # Dead end (or an unclosable full path): step back until some step has another candidate left
+        while True:
+            if len(path) == 1 or (max_backtracks is not None and backtracks >= max_backtracks):
+                return None
+
+            depth = len(path) - 1
+            _unvisit(path, moves, degree, visited)
+            backtracks += 1
+
+            candidates = _ranked_candidates(path[-1], moves, degree, visited, tie_rank)
+            if choice[depth] + 1 < len(candidates):
+                choice[depth] += 1
+                _visit(path, candidates[choice[depth]], moves, degree, visited)
+                break
+
+
+def knight_move_table(n):
+    # moves[8 * square + k] is the square reached by the k-th entry of KNIGHT_MOVES, or -1 if it's off the board
+    moves = array("i", [-1]) * (8 * n * n)
+
+    for row in range(n):
+        for column in range(n):
+            base = 8 * (row * n + column)
+
+            for k, (dr, dc) in enumerate(KNIGHT_MOVES):
+                r, c = row + dr, column + dc
+
+                if 0 <= r < n and 0 <= c < n:
+                    moves[base + k] = r * n + c
+
+    return moves
+
+
+def knight_degrees(moves, n):
+    # How many knight moves each square has on an empty board
+    return bytearray(sum(moves[base + k] != -1 for k in range(8)) for base in range(0, 8 * n * n, 8))
+
+
+def is_knights_tour(tour, n, closed=True):
+    # Every square exactly once, each step a knight move, and for a closed tour a move from the last back to the first
+    if len(tour) != n * n or len(set(tour)) != n * n:
+        return False
+
+    if not all(0 <= r < n and 0 <= c < n for r, c in tour):
+        return False
+
+    steps = zip(tour, tour[1:] + tour[:1]) if closed and n > 1 else zip(tour, tour[1:])
+
+    return all(sorted((abs(a[0] - b[0]), abs(a[1] - b[1]))) == [1, 2] for a, b in steps)
+
+
+def get_tour_board_string(tour, n):
+    # The board with every square numbered by the move the knight lands on it, starting at 1
+    order = [[0] * n for i in range(n)]
+    for move, (r, c) in enumerate(tour, 1):
+        order[r][c] = move
+
+    padding = len(str(n * n))
+
+    output = ""
+    for row in order:
+        output += " ".join(str(move).rjust(padding) for move in row) + "\n"
+
+    return output
+
+
+def tie_ranks(n):
+    # Every square's Warnsdorff tie-break rank, lowest for the squares farthest from the centre
+    return array("i", [_tie_rank(square, n) for square in range(n * n)])
+
+
+def central_squares(n):
+    # The squares of the 4 x 4 block in the middle of the board, nearest the centre first
+    middle = range(max(0, n // 2 - 2), min(n, n // 2 + 2))
+    squares = [r * n + c for r in middle for c in middle]
+    squares.sort(key=lambda square: (-_tie_rank(square, n), square))
+
+    return squares
+
+
+def _tie_rank(square, n):
+    # Squared distance from the centre of the board (doubled, to stay in integers), negated so the
+    # farthest square sorts first
+    r, c = divmod(square, n)
+    return -((2 * r - n + 1) ** 2 + (2 * c - n + 1) ** 2)
+
+
+def _best_candidate(square, moves, degree, visited, tie_rank):
+    best = -1
+    best_key = None
+
+    for k in range(8 * square, 8 * square + 8):
+        target = moves[k]
+
+        if target != -1 and not visited[target]:
+            key = (degree[target], tie_rank[target])
+
+            if best_key is None or key < best_key:
+                best, best_key = target, key
+
+    return best
+
+
+def _ranked_candidates(square, moves, degree, visited, tie_rank):
+    # Every unvisited square one move away, best first, in the same order _best_candidate picks them
+    candidates = [moves[k] for k in range(8 * square, 8 * square + 8) if moves[k] != -1 and not visited[moves[k]]]
+    candidates.sort(key=lambda target: (degree[target], tie_rank[target]))
+
+    return candidates
+
+
+def _visit(path, square, moves, degree, visited):
+    visited[square] = 1
+    path.append(square)
+    _leave(moves, degree, square)
+
+
+def _unvisit(path, moves, degree, visited):
+    square = path.pop()
+    visited[square] = 0
+
+    for k in range(8 * square, 8 * square + 8):
+        if moves[k] != -1:
+            degree[moves[k]] += 1
+
+
+def _leave(moves, degree, square):
+    # square is taken, so it's one fewer way onward for each of its neighbours
+    for k in range(8 * square, 8 * square + 8):
+        if moves[k] != -1:
+            degree[moves[k]] -= 1
+
+
+def _knight_move(a, b, n):
+    dr = abs(a // n - b // n)
+    dc = abs(a % n - b % n)
+
+    return (dr == 1 and dc == 2) or (dr == 2 and dc == 1)
+
+
+def _close_by_rotation(path, moves, start, n, depth=2):
+    # Posa rotation: if the end of the path is a knight move from path[i], then
+    # path[:i + 1] + reversed(path[i + 1:]) is also a Hamiltonian path, now ending at path[i + 1].
+    # Try every rotation from the current end, and recurse up to depth times, until an end sits next to start.
+    position = array("i", bytes(4 * len(path)))
+    for i, square in enumerate(path):
+        position[square] = i
+
+    return _rotate(path, position, moves, start, n, depth)
+
+
+def _rotate(path, position, moves, start, n, depth):
+    end = path[-1]
+
+    for k in range(8 * end, 8 * end + 8):
+        pivot = moves[k]
+
+        if pivot == -1:
+            continue
+
+        i = position[pivot]
+        if i >= len(path) - 2:
+            continue
+
+        # Only the new end matters for the check, the reversal is done once it's worth keeping
+        if _knight_move(path[i + 1], start, n) or depth > 1:
+            tail = path[i + 1:]
+            tail.reverse()
+            path[i + 1:] = tail
+            for j in range(i + 1, len(path)):
+                position[path[j]] = j
+
+            if _knight_move(path[-1], start, n) or (depth > 1 and _rotate(path, position, moves, start, n, depth - 1)):
+                return True
+
+            # Undo it and try the next pivot
+            tail.reverse()
+            path[i + 1:] = tail
+            for j in range(i + 1, len(path)):
+                position[path[j]] = j
+
+    return False
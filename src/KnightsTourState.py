@@ -1,55 +1,79 @@
-from copy import deepcopy
+from array import array
+from random import Random
+
+from KnightsTourSolver import knight_move_table
 
 
 class KnightsTourState:
-    def __init__(self, knight_location, parent_state, n):
+    # The whole search state of a knight's tour, changed in place as the search goes deeper and backs up.
+    # Squares are numbered row * n + column, the visited squares are the set bits of one int, and the tour so far
+    # is a single array of squares, so moving the knight (make) and taking the move back (unmake) are O(1)
+    # instead of copying a set of visited squares into a new state for every move.
+    # hash is a Zobrist hash of (visited squares, knight square), kept up to date by make/unmake, for
+    # looking the state up in a TranspositionTable.
+    def __init__(self, n, starting_location):
         self.n = n
-        self.knight_location = knight_location
-        self.neighbors = []
+        self.start = starting_location[0] * n + starting_location[1]
+
+        # Precomputed once per board: every square's knight moves, and the same moves as a bitmask
+        table = knight_move_table(n)
+        self.moves = [tuple(square for square in table[base:base + 8] if square != -1)
+                      for base in range(0, 8 * n * n, 8)]
+        self.move_masks = [sum(1 << square for square in squares) for squares in self.moves]
+
+        # One random 64-bit key per square for being visited and one for holding the knight, the same on every run
+        rng = Random(n)
+        self.visited_keys = [rng.getrandbits(64) for i in range(n * n)]
+        self.knight_keys = [rng.getrandbits(64) for i in range(n * n)]
+
+        self.path = array("i", [self.start])
+        self.visited = 1 << self.start
+        self.hash = self.visited_keys[self.start] ^ self.knight_keys[self.start]
+
+    def make(self, square):
+        self.hash ^= self.knight_keys[self.path[-1]] ^ self.knight_keys[square] ^ self.visited_keys[square]
+        self.path.append(square)
+        self.visited |= 1 << square
 
-        if parent_state is not None:
-            self.visited_locations = deepcopy(parent_state.visited_locations)
-            self.visited_locations.add(knight_location)
-            self.starting_location = parent_state.starting_location
-        else:
-            self.starting_location = knight_location
-            self.visited_locations = set()
-        self.parent_state = parent_state
+    def unmake(self):
+        square = self.path.pop()
+        self.visited ^= 1 << square
+        self.hash ^= self.knight_keys[square] ^ self.knight_keys[self.path[-1]] ^ self.visited_keys[square]
 
-        # See how many neighbors this state has
-        movement_tuples = [(-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1)]
+        return square
 
-        for m_t in movement_tuples:
-            r, c = self.knight_location
+    def degree(self, square):
+        # Unvisited squares one move away from square
+        return (self.move_masks[square] & ~self.visited).bit_count()
 
-            r += m_t[0]
-            c += m_t[1]
+    def unvisited_moves(self, square):
+        visited = self.visited
+        return [target for target in self.moves[square] if not visited >> target & 1]
 
-            # If this point is on the board
-            if 0 <= r < self.n and 0 <= c < self.n:
-                square = r, c
+    def is_complete(self):
+        return len(self.path) == self.n * self.n
 
-                # Has this square been visited by the knight in this state yet?
-                if square not in self.visited_locations:
-                    self.neighbors.append(square)
+    def is_closed(self):
+        # Every square visited and the knight can jump straight back to the start
+        return self.is_complete() and self.move_masks[self.path[-1]] >> self.start & 1 == 1
 
-    def __lt__(self, other):
-        our_visited = len(self.visited_locations)
-        their_visited = len(other.visited_locations)
-        
-        our_distance = abs(self.knight_location[0] - self.starting_location[0]) + abs(self.knight_location[1] - self.starting_location[1])
-        their_distance = abs(other.knight_location[0] - other.starting_location[0]) + abs(other.knight_location[1] - other.starting_location[1])
+    def tour(self):
+        return [divmod(square, self.n) for square in self.path]
 
-        our_neighbors = len(self.neighbors)
-        their_neighbors = len(other.neighbors)
-        if our_visited == their_visited:
-            if our_distance == their_distance:
-                if our_neighbors != 0:
-                    return our_neighbors < their_neighbors
+    # (row, column) views of the state, for printing the board
 
-                return False
-            return our_distance > their_distance
+    @property
+    def knight_location(self):
+        return divmod(self.path[-1], self.n)
 
-        return our_visited > their_visited
+    @property
+    def starting_location(self):
+        return divmod(self.start, self.n)
 
+    @property
+    def visited_locations(self):
+        return {divmod(square, self.n) for square in self.path}
 
+    @property
+    def neighbors(self):
+        return [divmod(square, self.n) for square in self.unvisited_moves(self.path[-1])]
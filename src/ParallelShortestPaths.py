@@ -0,0 +1,133 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from heapq import heappush, heappop
+from math import inf, isfinite
+from os import cpu_count
+
+from CSRGraph import CSRGraph
+from Homework8GraphAlgorithms import shortest_path_potentials
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The CSR arrays each worker process searches, set once by _init_worker
+_worker_graph = None
+
+
+def parallel_all_pairs_shortest_paths(graph, max_workers=None, sources_per_task=None, as_array=False):
+    # All-pairs shortest paths by running a heap Dijkstra from every source, with the sources split
+    # across a process pool. The CSR arrays go to each worker once when it starts, never per task.
+    # Returns the same inf-padded matrix as floyd_warshall, or a NumPy matrix with as_array=True.
+    if not isinstance(graph, CSRGraph):
+        graph = CSRGraph.from_adjacency_dict(graph)
+
+    n = len(graph)
+    integral = graph.weight_typecode() != "d"
+
+    # Dijkstra needs non-negative weights, so reweight with Johnson's potentials if any edge is negative
+    if any(weight < 0 for weight in graph.weights):
+        h = shortest_path_potentials(graph, range(n))[0]
+        weights = array(graph.weight_typecode(), (weight + h[u] - h[v] for u, v, weight in graph.edges()))
+    else:
+        h = None
+        weights = graph.weights
+
+    if max_workers is None:
+        max_workers = cpu_count() or 1
+
+    # A few tasks per worker keeps them all busy without paying per-task overhead on every source
+    if sources_per_task is None:
+        sources_per_task = max(1, n // (max_workers * 4))
+
+    # Rows land in a preallocated matrix as soon as their chunk finishes
+    if as_array:
+        if np is None:
+            raise ImportError("as_array=True requires NumPy to be installed")
+        matrix = np.empty((n, n))
+    else:
+        matrix = [None] * n
+
+    # memoryviews over a mapped file can't be pickled: a memory-mapped graph is reopened from its file in every
+    # worker, which shares the page cache, and anything else goes over as plain arrays
+    if graph.path is not None and h is None:
+        initargs = (graph.path,)
+    else:
+        initargs = tuple(_as_array(buffer) for buffer in (graph.offsets, graph.targets, weights))
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs) as executor:
+        futures = [executor.submit(_shortest_path_rows, first, min(n, first + sources_per_task))
+                   for first in range(0, n, sources_per_task)]
+
+        for future in as_completed(futures):
+            first, rows = future.result()
+
+            for source, row in enumerate(rows, first):
+                # Undo the reweighting: d(u, v) = d'(u, v) - h(u) + h(v)
+                if h is not None:
+                    row = [dist - h[source] + h[v] if dist != inf else inf for v, dist in enumerate(row)]
+
+                if as_array:
+                    matrix[source] = row
+                elif integral:
+                    matrix[source] = [int(dist) if isfinite(dist) else inf for dist in row]
+                else:
+                    matrix[source] = list(row)
+
+    return matrix
+
+
+def _init_worker(*graph):
+    # Either the path of a CSR graph file or its three arrays
+    global _worker_graph
+
+    if len(graph) == 1:
+        graph = CSRGraph.load(graph[0])
+        _worker_graph = (graph.offsets, graph.targets, graph.weights)
+    else:
+        _worker_graph = graph
+
+
+def _as_array(buffer):
+    if isinstance(buffer, memoryview):
+        return array(buffer.format, buffer.tobytes())
+
+    return buffer
+
+
+def _shortest_path_rows(first, last):
+    offsets, targets, weights = _worker_graph
+    rows = [_dijkstra_distances(offsets, targets, weights, source) for source in range(first, last)]
+
+    return first, rows
+
+
+def _dijkstra_distances(offsets, targets, weights, source):
+    # The same lazy-deletion heap Dijkstra as dijkstras_algorithm, straight off the CSR arrays
+    n = len(offsets) - 1
+    dist = array("d", [inf]) * n
+    visited = bytearray(n)
+
+    dist[source] = 0
+    frontier = [(0, source)]
+    settled = 0
+
+    while frontier and settled < n:
+        current_dist, node = heappop(frontier)
+
+        if visited[node]:
+            continue
+
+        visited[node] = 1
+        settled += 1
+
+        for i in range(offsets[node], offsets[node + 1]):
+            neighbor = targets[i]
+            new_dist = current_dist + weights[i]
+
+            if not visited[neighbor] and new_dist < dist[neighbor]:
+                dist[neighbor] = new_dist
+                heappush(frontier, (new_dist, neighbor))
+
+    return dist
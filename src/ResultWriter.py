@@ -0,0 +1,151 @@
+from queue import Queue, Empty
+from threading import Thread
+import sys
+
+# Queue entries are (kind, target, payload, echo)
+_APPEND, _FILE, _CONSOLE, _STOP = range(4)
+
+
+class ResultWriter:
+    # Owns every file and console write of a run on one background thread, so the compute loop only ever
+    # hands off a string (or a generator of strings) and moves on. The queue is bounded: if the disk or
+    # terminal falls behind by max_pending items, the producer waits instead of piling up memory.
+    # The thread drains up to batch_size items at a time and does one write per file and one for the
+    # console per batch. Report files stay open until close(), whole files are closed as soon as they're done.
+    # With quiet=True only the lines printed with summary=True reach the console; files are written in full.
+    def __init__(self, max_pending=1024, batch_size=256, quiet=False, console=None):
+        self.quiet = quiet
+        self.batch_size = batch_size
+        self.console = console if console is not None else sys.stdout
+
+        self._queue = Queue(max_pending)
+        self._files = {}
+        self._error = None
+
+        self._thread = Thread(target=self._run, name="ResultWriter", daemon=True)
+        self._thread.start()
+
+    def print(self, text="", summary=False):
+        # Queued stand-in for print(): one line of console output
+        if summary or not self.quiet:
+            self._put((_CONSOLE, None, str(text) + "\n", False))
+
+    def append(self, path, text):
+        # Add text to a report file, opened (and truncated) the first time it's used
+        self._put((_APPEND, path, text, False))
+
+    def write_file(self, path, chunks, echo=False):
+        # Write a whole file from an iterable of strings, e.g. iter_dot_syntax(...). The iterable is consumed
+        # on the writer thread, so it must not depend on anything the caller changes afterwards.
+        self._put((_FILE, path, chunks, echo and not self.quiet))
+
+    def flush(self):
+        # Wait until everything queued so far is on disk (e.g. before rendering the .dot files)
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put((_STOP, None, None, False))
+            self._thread.join()
+
+        for file in self._files.values():
+            file.close()
+
+        self._files.clear()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Everything queued is written either way, but a write error mustn't replace the exception
+        # that's already on its way out
+        try:
+            self.close()
+        except Exception:
+            if exc_type is None:
+                raise
+
+    def _put(self, item):
+        self._raise_error()
+        self._queue.put(item)
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _run(self):
+        stopping = False
+
+        while not stopping:
+            # Block for the first item, then take whatever else is already waiting
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            try:
+                stopping = self._write_batch(batch)
+            finally:
+                for item in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch):
+        # Pending text per report file and for the console, written out in one go each. A write that fails
+        # only loses itself: the first error is kept for the producer's next call and the rest still go out.
+        pending = {}
+        console = []
+        stopping = False
+
+        for kind, target, payload, echo in batch:
+            if kind == _STOP:
+                stopping = True
+            elif kind == _CONSOLE:
+                console.append(payload)
+            elif kind == _APPEND:
+                pending.setdefault(target, []).append(payload)
+            elif kind == _FILE:
+                # Keep the console in order around an echoed file
+                if echo and console:
+                    self._attempt(self.console.write, "".join(console))
+                    console = []
+
+                self._attempt(self._write_file, target, payload, echo)
+
+        for path, texts in pending.items():
+            self._attempt(self._append, path, "".join(texts))
+
+        if console:
+            self._attempt(self.console.write, "".join(console))
+
+        self._attempt(self.console.flush)
+        return stopping
+
+    def _write_file(self, path, chunks, echo):
+        with open(path, "w") as file:
+            for chunk in chunks:
+                file.write(chunk)
+
+                if echo:
+                    self.console.write(chunk)
+
+        if echo:
+            self.console.write("\n\n")
+
+    def _append(self, path, text):
+        if path not in self._files:
+            self._files[path] = open(path, "w")
+
+        self._files[path].write(text)
+
+    def _attempt(self, write, *args):
+        # Surfaced on the producer's next call; keep draining so it never blocks on a full queue
+        try:
+            write(*args)
+        except Exception as error:
+            if self._error is None:
+                self._error = error
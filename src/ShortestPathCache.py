@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from math import inf
+
+from Homework8GraphAlgorithms import dijkstras_algorithm, floyd_warshall, reachability_bitsets, closure_from_bitsets
+
+
+class ShortestPathCache:
+    # Wraps an adjacency-dict (like the ones random_graph makes) and remembers query results:
+    # Dijkstra per source in a small LRU, plus the Floyd-Warshall matrix and the reachability bitsets.
+    # Edge changes go through set_edge()/remove_edge() so the cached results stay correct.
+    # Additions and decreases are patched in place, increases and deletions drop only what they could affect.
+    def __init__(self, graph, directed=True, max_sources=128):
+        self.graph = graph
+        self.directed = directed
+        self.max_sources = max_sources
+
+        # source -> (d, pi), least recently used first
+        self._dijkstra = OrderedDict()
+        self._matrix = None
+        self._reach = None
+
+    def dijkstra(self, source):
+        # The caller gets copies of the (d, pi) dicts, so changing them can't corrupt the cache
+        if source in self._dijkstra:
+            self._dijkstra.move_to_end(source)
+            d, pi = self._dijkstra[source]
+        else:
+            d, pi = dijkstras_algorithm(self.graph, source)
+            self._dijkstra[source] = (d, pi)
+
+            # Evict the least recently used source
+            if len(self._dijkstra) > self.max_sources:
+                self._dijkstra.popitem(last=False)
+
+        return dict(d), dict(pi)
+
+    def floyd_warshall(self):
+        # The cached matrix itself, copying n^2 entries on every call would cost as much as a lookup saves.
+        # Don't modify it.
+        if self._matrix is None:
+            self._matrix = floyd_warshall(self.graph)
+
+        return self._matrix
+
+    def transitive_closure(self):
+        if self._reach is None:
+            self._reach = reachability_bitsets(self.graph)
+
+        # Same list-of-dicts shape transitive_closure returns
+        return closure_from_bitsets(self._reach)
+
+    def set_edge(self, u, v, weight):
+        # Add the edge u -> v, or change its weight (both directions for an undirected graph)
+        for a, b in self._directions(u, v):
+            old_weight = self.graph[a].get(b)
+            self.graph[a][b] = weight
+
+            if old_weight is None or weight < old_weight:
+                self._edge_decreased(a, b, weight)
+            elif weight > old_weight:
+                self._edge_increased(a, b, old_weight)
+
+    def remove_edge(self, u, v):
+        for a, b in self._directions(u, v):
+            old_weight = self.graph[a].pop(b)
+            self._edge_increased(a, b, old_weight)
+
+            # Losing an edge can disconnect things, the bitsets have to be rebuilt
+            self._reach = None
+
+    def _directions(self, u, v):
+        if self.directed:
+            return [(u, v)]
+
+        return [(u, v), (v, u)]
+
+    def _edge_decreased(self, u, v, weight):
+        # A cached source only changes if the cheaper edge now beats its distance to v
+        for source, (d, pi) in list(self._dijkstra.items()):
+            if d[u] + weight <= d[v]:
+                del self._dijkstra[source]
+
+        if self._matrix is not None:
+            matrix = self._matrix
+
+            # A new negative cycle breaks the O(n^2) update, recompute from scratch next time
+            if matrix[v][u] + weight < 0:
+                self._matrix = None
+            else:
+                # Every shortest path that improves now goes i -> u -> v -> j
+                row_v = matrix[v]
+                for i in range(len(matrix)):
+                    to_u = matrix[i][u]
+
+                    if to_u == inf:
+                        continue
+
+                    via = to_u + weight
+                    row = matrix[i]
+                    for j, from_v in enumerate(row_v):
+                        if via + from_v < row[j]:
+                            row[j] = via + from_v
+
+        if self._reach is not None:
+            # Everything that reaches u now reaches whatever v reaches
+            bit_u = 1 << u
+            reach_v = self._reach[v]
+            for i, bits in enumerate(self._reach):
+                if bits & bit_u:
+                    self._reach[i] = bits | reach_v
+
+    def _edge_increased(self, u, v, old_weight):
+        # Only sources whose shortest path tree used the edge can change
+        for source, (d, pi) in list(self._dijkstra.items()):
+            if pi[v] == u:
+                del self._dijkstra[source]
+
+        # Same for the matrix: if no shortest path was tight through the edge, nothing moves
+        if self._matrix is not None:
+            matrix = self._matrix
+            for i in range(len(matrix)):
+                if matrix[i][u] != inf and matrix[i][u] + old_weight == matrix[i][v]:
+                    self._matrix = None
+                    break
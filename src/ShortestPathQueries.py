@@ -0,0 +1,142 @@
+from heapq import heappush, heappop
+from math import inf
+
+from Homework8GraphAlgorithms import dijkstras_algorithm
+
+# Point-to-point shortest path queries. Every function here needs non-negative edge weights,
+# the same as dijkstras_algorithm. Each returns (distance, number of nodes settled), with inf if t is unreachable.
+
+
+def shortest_path_query(graph, s, t, landmarks=None):
+    # Dijkstra from s that stops as soon as t is settled.
+    # With a LandmarkIndex it becomes A* with the ALT lower bounds as the heuristic.
+    if landmarks is None:
+        def potential(node):
+            return 0
+    else:
+        def potential(node):
+            return landmarks.lower_bound(node, t)
+
+    d = {s: 0}
+    visited = set()
+    frontier = [(potential(s), s)]
+
+    while frontier:
+        priority, node = heappop(frontier)
+
+        if node in visited:
+            continue
+
+        visited.add(node)
+
+        # Early exit: t is settled, nothing later can improve it
+        if node == t:
+            return d[t], len(visited)
+
+        for neighbor, weight in graph[node].items():
+            new_dist = d[node] + weight
+
+            if neighbor not in visited and new_dist < d.get(neighbor, inf):
+                d[neighbor] = new_dist
+                heappush(frontier, (new_dist + potential(neighbor), neighbor))
+
+    return inf, len(visited)
+
+
+def bidirectional_dijkstra(graph, s, t, reverse=None):
+    # Grow one Dijkstra forward from s and one backward from t (over the reversed graph), always
+    # expanding the smaller frontier, and stop once the two radii together can't beat the best meeting point
+    if reverse is None:
+        reverse = reverse_graph(graph)
+
+    if s == t:
+        return 0, 1
+
+    graphs = (graph, reverse)
+    d = ({s: 0}, {t: 0})
+    visited = (set(), set())
+    frontiers = ([(0, s)], [(0, t)])
+
+    best = inf
+    while frontiers[0] and frontiers[1]:
+        # The smallest key in each direction is a lower bound on anything still unsettled there
+        if frontiers[0][0][0] + frontiers[1][0][0] >= best:
+            break
+
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        dist, node = heappop(frontiers[side])
+
+        if node in visited[side]:
+            continue
+
+        visited[side].add(node)
+
+        for neighbor, weight in graphs[side][node].items():
+            new_dist = dist + weight
+
+            if new_dist < d[side].get(neighbor, inf):
+                d[side][neighbor] = new_dist
+                heappush(frontiers[side], (new_dist, neighbor))
+
+            # Every edge touching the other search's labels is a candidate s -> t path
+            if neighbor in d[1 - side] and new_dist + d[1 - side][neighbor] < best:
+                best = new_dist + d[1 - side][neighbor]
+
+    return best, len(visited[0]) + len(visited[1])
+
+
+def reverse_graph(graph):
+    # Adjacency-dict with every edge flipped, for searching backward from a target
+    reverse = [{} for i in range(len(graph))]
+
+    for u in range(len(graph)):
+        for v, weight in graph[u].items():
+            reverse[v][u] = weight
+
+    return reverse
+
+
+class LandmarkIndex:
+    # ALT ("A*, landmarks, triangle inequality") preprocessing: exact distances from and to a few landmark nodes.
+    # For any landmark L, d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L),
+    # so the largest of those bounds is an admissible A* heuristic towards t.
+    def __init__(self, graph, landmarks, reverse=None):
+        if reverse is None:
+            reverse = reverse_graph(graph)
+
+        self.landmarks = list(landmarks)
+
+        # One dijkstras_algorithm run each way per landmark
+        self.from_landmark = [dijkstras_algorithm(graph, landmark)[0] for landmark in self.landmarks]
+        self.to_landmark = [dijkstras_algorithm(reverse, landmark)[0] for landmark in self.landmarks]
+
+    @classmethod
+    def farthest(cls, graph, count, start_node=0, reverse=None):
+        # Pick landmarks greedily, each one as far as possible from the ones already chosen
+        landmarks = [start_node]
+        closest = dict(dijkstras_algorithm(graph, start_node)[0])
+
+        while len(landmarks) < min(count, len(graph)):
+            candidates = [node for node in closest if node not in landmarks]
+
+            # Unreachable nodes first, they make the best bounds
+            landmark = max(candidates, key=lambda node: closest[node])
+            landmarks.append(landmark)
+
+            for node, dist in dijkstras_algorithm(graph, landmark)[0].items():
+                closest[node] = min(closest[node], dist)
+
+        return cls(graph, landmarks, reverse)
+
+    def lower_bound(self, v, t):
+        bound = 0
+
+        for from_landmark, to_landmark in zip(self.from_landmark, self.to_landmark):
+            # Unreachable landmarks give no information
+            if from_landmark[t] != inf and from_landmark[v] != inf:
+                bound = max(bound, from_landmark[t] - from_landmark[v])
+
+            if to_landmark[v] != inf and to_landmark[t] != inf:
+                bound = max(bound, to_landmark[v] - to_landmark[t])
+
+        return bound
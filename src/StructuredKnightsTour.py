@@ -0,0 +1,376 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+from KnightsTourSolver import KNIGHT_MOVES
+
+# Boards with both sides at most this big are solved directly by search, bigger ones are split into quadrants
+MAX_BASE_SIDE = 12
+
+# Structured base tours found so far in this process, (rows, cols) -> flat two-neighbour array, see _base_tour
+_base_tours = {}
+
+
+class StructuredTour:
+    # Parberry's divide-and-conquer closed knight's tour on a rows x cols board (both even, at least 6, and
+    # differing by at most 2, which covers every n x n board with even n >= 6).
+    #
+    # A tour is "structured" if it contains the two moves next to each corner that _corner_edges lists.
+    # Boards with both sides at most MAX_BASE_SIDE get a structured tour by backtracking search (6x6 .. 12x12,
+    # generated in parallel across processes). Bigger boards are cut into four quadrants, each with a structured
+    # tour of its own, and at the centre one corner move of each quadrant is swapped for a move into the next
+    # quadrant so the four cycles become one. The outer corner moves are untouched, so the result is
+    # structured again and the construction recurses.
+    #
+    # Splits only depend on the shape, so just a few distinct shapes ever show up and each one's stitch is
+    # worked out once. Nothing the size of the board is stored: neighbors() answers for any square by walking
+    # down the O(log n) levels, so a 10^4 x 10^4 tour is ready in well under a second and walk() streams it
+    # in constant memory. tour() builds the full two-neighbour table instead, which is much faster per square.
+    def __init__(self, rows, cols=None, max_workers=None):
+        if cols is None:
+            cols = rows
+
+        if rows % 2 or cols % 2 or min(rows, cols) < 6 or abs(rows - cols) > 2:
+            raise ValueError("StructuredTour needs even sides of at least 6 that differ by at most 2, got {}x{}"
+                             .format(rows, cols))
+
+        self.rows = rows
+        self.cols = cols
+
+        # shape -> (top rows, left columns, stitch) for every shape that gets split
+        self._plans = {}
+        base_shapes = set()
+        self._plan(rows, cols, base_shapes)
+
+        _generate_base_tours(base_shapes, max_workers)
+
+    def __len__(self):
+        return self.rows * self.cols
+
+    def neighbors(self, square):
+        # The two squares the tour visits right before and right after square
+        r, c = square
+        rows, cols = self.rows, self.cols
+        top = left = 0
+        swaps = []
+
+        # Walk down to the base board holding square, noting any stitch it's part of on the way
+        while (rows, cols) in self._plans:
+            split_rows, split_cols, stitch = self._plans[rows, cols]
+
+            swap = stitch.get((r - top, c - left))
+            if swap is not None:
+                swaps.append(((swap[0][0] + top, swap[0][1] + left), (swap[1][0] + top, swap[1][1] + left)))
+
+            if r - top < split_rows:
+                rows = split_rows
+            else:
+                top += split_rows
+                rows -= split_rows
+
+            if c - left < split_cols:
+                cols = split_cols
+            else:
+                left += split_cols
+                cols -= split_cols
+
+        tour = _base_tours[rows, cols]
+        local = (r - top) * cols + (c - left)
+        pair = [divmod(tour[2 * local], cols), divmod(tour[2 * local + 1], cols)]
+        pair = [(top + pr, left + pc) for pr, pc in pair]
+
+        # Each stitch swaps one of square's base moves for a move into the next quadrant
+        for dropped, added in swaps:
+            pair[pair.index(dropped)] = added
+
+        return pair[0], pair[1]
+
+    def walk(self, starting_square=(0, 0)):
+        # Every square of the closed tour in order, starting at starting_square, without storing the board
+        previous = None
+        square = tuple(starting_square)
+
+        for i in range(len(self)):
+            yield square
+
+            first, second = self.neighbors(square)
+            previous, square = square, second if first == previous else first
+
+    def tour(self, starting_square=(0, 0)):
+        # The whole closed tour as a list of (row, column) squares
+        table = self.neighbor_table()
+        cols = self.cols
+
+        start = starting_square[0] * cols + starting_square[1]
+        path = array("i", [start])
+
+        previous, square = -1, start
+        for i in range(len(self) - 1):
+            first = table[2 * square]
+            previous, square = square, table[2 * square + 1] if first == previous else first
+            path.append(square)
+
+        return [divmod(square, cols) for square in path]
+
+    def neighbor_table(self):
+        # table[2 * (r * cols + c)] and the entry after it are the two neighbours of (r, c), as square numbers
+        table = array("i", bytes(8 * len(self)))
+        self._fill(table, self.rows, self.cols, 0, 0)
+
+        return table
+
+    def _fill(self, table, rows, cols, top, left):
+        width = self.cols
+
+        if (rows, cols) not in self._plans:
+            # Copy the base tour in, moved to this board's corner
+            tour = _base_tours[rows, cols]
+
+            for local in range(rows * cols):
+                r, c = divmod(local, cols)
+                square = (top + r) * width + left + c
+
+                for k in (0, 1):
+                    nr, nc = divmod(tour[2 * local + k], cols)
+                    table[2 * square + k] = (top + nr) * width + left + nc
+
+            return
+
+        split_rows, split_cols, stitch = self._plans[rows, cols]
+
+        for quadrant_top, quadrant_rows in ((0, split_rows), (split_rows, rows - split_rows)):
+            for quadrant_left, quadrant_cols in ((0, split_cols), (split_cols, cols - split_cols)):
+                self._fill(table, quadrant_rows, quadrant_cols, top + quadrant_top, left + quadrant_left)
+
+        for (r, c), (dropped, added) in stitch.items():
+            square = (top + r) * width + left + c
+            dropped = (top + dropped[0]) * width + left + dropped[1]
+            added = (top + added[0]) * width + left + added[1]
+
+            k = 0 if table[2 * square] == dropped else 1
+            table[2 * square + k] = added
+
+    def _plan(self, rows, cols, base_shapes):
+        if (rows, cols) in self._plans or (rows, cols) in base_shapes:
+            return
+
+        if rows <= MAX_BASE_SIDE and cols <= MAX_BASE_SIDE:
+            base_shapes.add((rows, cols))
+            return
+
+        split_rows = _split(rows)
+        split_cols = _split(cols)
+        self._plans[rows, cols] = (split_rows, split_cols, _find_stitch(split_rows, split_cols))
+
+        for quadrant_rows in (split_rows, rows - split_rows):
+            for quadrant_cols in (split_cols, cols - split_cols):
+                self._plan(quadrant_rows, quadrant_cols, base_shapes)
+
+
+def structured_tour(n, starting_square=(0, 0), max_workers=None):
+    # Closed knight's tour on an n x n board by divide and conquer, in the same shape warnsdorff_tour returns:
+    # the squares in order as (row, column) tuples, or None if there is no closed tour
+    if n == 1:
+        return [tuple(starting_square)]
+
+    if n % 2 == 1 or n < 6:
+        return None
+
+    return StructuredTour(n, n, max_workers).tour(starting_square)
+
+
+def _split(side):
+    # Two even halves: equal when side is a multiple of 4, otherwise 2 apart
+    half = side // 2
+
+    if half % 2 == 0:
+        return half
+
+    return half - 1
+
+
+def _corner_edges(r0, c0, dr, dc):
+    # The two moves a structured tour makes at the corner square (r0, c0), which opens towards (dr, dc).
+    # The corner square only has two moves, so every tour has the first one; the second is the real constraint.
+    return [((r0, c0), (r0 + dr, c0 + 2 * dc)), ((r0, c0 + dc), (r0 + 2 * dr, c0))]
+
+
+def _board_corners(rows, cols):
+    return [(0, 0, 1, 1), (0, cols - 1, 1, -1), (rows - 1, 0, -1, 1), (rows - 1, cols - 1, -1, -1)]
+
+
+def _find_stitch(split_rows, split_cols):
+    # The quadrants' corners that meet at the centre, in cyclic order: top left, top right, bottom right, bottom left.
+    # Dropping one corner move from each quadrant leaves four paths, and four moves between their ends
+    # have to join them into a single cycle. Only the eight ends matter, so trying every choice is cheap.
+    a, c = split_rows, split_cols
+    corners = [(a - 1, c - 1, -1, -1), (a - 1, c, -1, 1), (a, c, 1, 1), (a, c - 1, 1, -1)]
+
+    for choice in product((0, 1), repeat=4):
+        dropped = [_corner_edges(*corner)[pick] for corner, pick in zip(corners, choice)]
+
+        # End e of path q is dropped[q][e]
+        ends = [(q, e) for q in range(4) for e in (0, 1)]
+        for matching in _matchings(ends, dropped):
+            if _single_cycle(matching):
+                stitch = {}
+                for q, (u, v) in enumerate(dropped):
+                    stitch[u] = [v, None]
+                    stitch[v] = [u, None]
+
+                for (q, e), (p, f) in matching.items():
+                    stitch[dropped[q][e]][1] = dropped[p][f]
+
+                return {square: tuple(swap) for square, swap in stitch.items()}
+
+    raise ValueError("No stitch joins the quadrants split at ({}, {})".format(split_rows, split_cols))
+
+
+def _matchings(ends, dropped):
+    # Every way to pair up the ends with knight moves between different quadrants, as end -> end dicts
+    if not ends:
+        yield {}
+        return
+
+    first, rest = ends[0], ends[1:]
+    for i, other in enumerate(rest):
+        if other[0] != first[0] and _is_knight_move(dropped[first[0]][first[1]], dropped[other[0]][other[1]]):
+            for matching in _matchings(rest[:i] + rest[i + 1:], dropped):
+                matching[first] = other
+                matching[other] = first
+                yield matching
+
+
+def _single_cycle(matching):
+    # Follow path 0 from end 0 to end 1, across the added move, through the next path, and so on
+    q, e = 0, 0
+    for length in range(1, 5):
+        q, e = matching[q, 1 - e]
+
+        if q == 0:
+            return length == 4
+
+    return False
+
+
+def _is_knight_move(a, b):
+    return sorted((abs(a[0] - b[0]), abs(a[1] - b[1]))) == [1, 2]
+
+
+def _generate_base_tours(shapes, max_workers=None):
+    # Search for every base tour not cached yet, each one in its own process
+    missing = sorted(set(shapes) - set(_base_tours))
+
+    if len(missing) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            tours = list(executor.map(_base_tour, [rows for rows, cols in missing], [cols for rows, cols in missing]))
+    else:
+        tours = [_base_tour(rows, cols) for rows, cols in missing]
+
+    _base_tours.update(zip(missing, tours))
+
+
+def _base_tour(rows, cols, max_nodes=1000000):
+    # Backtracking search for a structured closed tour on a small board, returned as a flat array holding the
+    # two neighbours of every square. Squares are tried in Warnsdorff order with the start counted as
+    # unvisited (see warnsdorff_tour), and the corner moves are forced: a square with one has to take it.
+    size = rows * cols
+    moves = [[(r + dr) * cols + c + dc for dr, dc in KNIGHT_MOVES if 0 <= r + dr < rows and 0 <= c + dc < cols]
+             for r in range(rows) for c in range(cols)]
+
+    forced = [-1] * size
+    for corner in _board_corners(rows, cols):
+        for (ur, uc), (vr, vc) in _corner_edges(*corner):
+            forced[ur * cols + uc] = vr * cols + vc
+            forced[vr * cols + vc] = ur * cols + uc
+
+    # The middle of the board works best as the root, with the rest as fallbacks
+    tie_rank = [-((2 * (s // cols) - rows + 1) ** 2 + (2 * (s % cols) - cols + 1) ** 2) for s in range(size)]
+    roots = sorted(range(size), key=lambda s: (-tie_rank[s], s))
+
+    for start in roots:
+        path = _forced_tour_search(start, moves, forced, tie_rank, max_nodes)
+
+        if path is not None:
+            tour = array("i", bytes(8 * size))
+            for i, square in enumerate(path):
+                tour[2 * square] = path[i - 1]
+                tour[2 * square + 1] = path[(i + 1) % size]
+
+            return tour
+
+    raise ValueError("No structured tour found on {}x{}".format(rows, cols))
+
+
+def _forced_tour_search(start, moves, forced, tie_rank, max_nodes):
+    size = len(moves)
+    visited = bytearray(size)
+    degree = [len(targets) for targets in moves]
+    path = [start]
+    visited[start] = 1
+
+    def candidates():
+        square = path[-1]
+        previous = path[-2] if len(path) > 1 else -1
+
+        # A forced move that isn't the one we came in on has to be next (the start takes its own first)
+        partner = forced[square]
+        if partner != -1 and partner != previous:
+            if visited[partner]:
+                return []
+            return [partner]
+
+        options = []
+        for target in moves[square]:
+            if visited[target]:
+                continue
+
+            # Coming into target by anything but its forced move only works if that move is still free
+            partner = forced[target]
+            if partner != -1 and partner != square and visited[partner] and \
+                    not (partner == start and len(path) + 1 == size):
+                continue
+
+            options.append(target)
+
+        # Best last so pop() takes it
+        options.sort(key=lambda target: (degree[target], tie_rank[target]), reverse=True)
+        return options
+
+    stack = [candidates()]
+    nodes = 0
+    while stack and nodes < max_nodes:
+        options = stack[-1]
+
+        if not options:
+            stack.pop()
+            if stack:
+                square = path.pop()
+                visited[square] = 0
+                for target in moves[square]:
+                    degree[target] += 1
+            continue
+
+        square = options.pop()
+        nodes += 1
+        path.append(square)
+        visited[square] = 1
+        for target in moves[square]:
+            degree[target] -= 1
+
+        if len(path) == size:
+            # Closed, and neither end's forced move left unused
+            last = path[-1]
+            if start in moves[last] and forced[last] in (-1, path[-2], start) and \
+                    forced[start] in (-1, path[1], last):
+                return path
+
+            path.pop()
+            visited[square] = 0
+            for target in moves[square]:
+                degree[target] += 1
+            continue
+
+        stack.append(candidates())
+
+    return None
@@ -0,0 +1,37 @@
+from array import array
+
+
+class TranspositionTable:
+    # Fixed-size table of search states already proven to be dead ends, keyed by 64-bit Zobrist hashes, so the
+    # search can cut any other path into the same state. Memory never grows past the size given up front.
+    # Every bucket has two slots: the first keeps whichever entry cut off the most work (the most squares
+    # still to fill), the second always takes the newest entry. Big proven subtrees survive, and recent ones,
+    # which are the likeliest to be reached again, still get a place.
+    def __init__(self, size=1 << 20):
+        buckets = 1
+        while 2 * buckets < size:
+            buckets *= 2
+
+        self.mask = buckets - 1
+        self.keys = array("Q", bytes(16 * buckets))
+
+        # Squares left to fill when the entry was stored, 0 for an empty slot
+        self.work = array("I", bytes(8 * buckets))
+
+    def __contains__(self, key):
+        i = 2 * (key & self.mask)
+
+        return (self.keys[i] == key and self.work[i] != 0) or (self.keys[i + 1] == key and self.work[i + 1] != 0)
+
+    def add(self, key, work):
+        i = 2 * (key & self.mask)
+
+        if work >= self.work[i]:
+            # The old deepest entry still beats whatever is in the always-replace slot
+            self.keys[i + 1], self.work[i + 1] = self.keys[i], self.work[i]
+            self.keys[i], self.work[i] = key, work
+        else:
+            self.keys[i + 1], self.work[i + 1] = key, work
+
+    def __len__(self):
+        return sum(1 for work in self.work if work)
@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from GraphRendering import render_dot_files
+
+# Stand-in for sfdp: logs every call, fails on .dot files that contain "fail", otherwise writes a fake png
+STUB_SFDP = """#!{python}
+import sys
+
+with open({log!r}, "a") as log:
+    log.write(" ".join(sys.argv[1:]) + "\\n")
+
+dot_path = sys.argv[2]
+png_path = sys.argv[sys.argv.index("-o") + 1]
+
+with open(dot_path) as dot:
+    if "fail" in dot.read():
+        sys.exit(1)
+
+with open(png_path, "wb") as png:
+    png.write(b"png of " + dot_path.encode())
+"""
+
+
+class RenderDotFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = self.directory.name
+        self.cache = os.path.join(self.root, "png_cache")
+        self.log = os.path.join(self.root, "sfdp.log")
+
+        # sfdp is looked up on PATH, so put the stub first
+        bin_directory = os.path.join(self.root, "bin")
+        os.makedirs(bin_directory)
+        sfdp = os.path.join(bin_directory, "sfdp")
+        with open(sfdp, "w") as file:
+            file.write(STUB_SFDP.format(python=sys.executable, log=self.log))
+        os.chmod(sfdp, 0o755)
+
+        path = mock.patch.dict(os.environ, {"PATH": bin_directory + os.pathsep + os.environ.get("PATH", "")})
+        path.start()
+        self.addCleanup(path.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def write_dot(self, name, text):
+        path = os.path.join(self.root, name)
+        with open(path, "w") as file:
+            file.write(text)
+
+        return path
+
+    def sfdp_calls(self):
+        if not os.path.exists(self.log):
+            return 0
+
+        with open(self.log) as file:
+            return len(file.readlines())
+
+    def test_identical_content_is_rendered_once(self):
+        first = self.write_dot("first.dot", "strict graph G\n{\n0 -- 1\n}\n")
+        second = self.write_dot("second.dot", "strict graph G\n{\n0 -- 1\n}\n")
+
+        self.assertEqual(render_dot_files([first], self.cache), [(first, os.path.join(self.root, "first.png"))])
+        self.assertEqual(self.sfdp_calls(), 1)
+
+        # Same content under another name comes straight from the cache
+        self.assertEqual(render_dot_files([second], self.cache), [(second, os.path.join(self.root, "second.png"))])
+        self.assertEqual(self.sfdp_calls(), 1)
+
+        with open(os.path.join(self.root, "first.png"), "rb") as first_png, \
+                open(os.path.join(self.root, "second.png"), "rb") as second_png:
+            self.assertEqual(first_png.read(), second_png.read())
+
+    def test_failed_render_is_not_cached(self):
+        broken = self.write_dot("broken.dot", "fail\n")
+
+        self.assertEqual(render_dot_files([broken], self.cache), [(broken, None)])
+        self.assertFalse(os.path.exists(os.path.join(self.root, "broken.png")))
+
+        # Nothing is left in the cache, not even the temporary file, so the next run tries again
+        self.assertEqual(os.listdir(self.cache), [])
+        render_dot_files([broken], self.cache)
+        self.assertEqual(self.sfdp_calls(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()